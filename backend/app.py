@@ -1,46 +1,194 @@
 from flask import Flask, request, jsonify, send_from_directory
+from flask.json.provider import JSONProvider, DefaultJSONProvider
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from backend.eventmobi_client import EventMobiClient
 from backend.webhook_handler import WebhookHandler
 from backend.config import Config
 import os
+import re
+import time
+import hashlib
+import logging
+import orjson
+import threading
+from collections import OrderedDict
 from urllib.parse import urljoin
 from pathlib import Path
 
 # Avoid eventlet greendns issues resolving external hosts (e.g., uapi.eventmobi.com)
+# when running with SOCKETIO_ASYNC_MODE=eventlet
 os.environ.setdefault('EVENTLET_NO_GREENDNS', 'yes')
 
-# Debug logging helper (controlled by APP_DEBUG=true)
+# Debug logging (controlled by APP_DEBUG=true)
 APP_DEBUG = os.environ.get('APP_DEBUG', 'false').lower() == 'true'
-def debug_print(*args, **kwargs):
-    if APP_DEBUG:
-        try:
-            print(*args, **kwargs)
-        except Exception:
-            pass
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG if APP_DEBUG else logging.INFO)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (used by jsonify and request.get_json)"""
+    
+    # Non-string dict keys are stringified, as with the stdlib encoder
+    OPTIONS = orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping a str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.OPTIONS)
+        return self._app.response_class(body, mimetype='application/json')
+
 
 app = Flask(__name__, static_folder=None)
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = Config.SECRET_KEY
 CORS(app, resources={r"/*": {"origins": Config.CORS_ORIGINS}})
 socketio = SocketIO(
     app, 
     cors_allowed_origins=Config.CORS_ORIGINS, 
-    async_mode='eventlet',
+    async_mode=Config.SOCKETIO_ASYNC_MODE,
     ping_timeout=60,
     ping_interval=25,
     max_http_buffer_size=1000000,
-    logger=True,
+    logger=Config.SOCKETIO_LOGGER,
     engineio_logger=False
 )
 
-# Track rooms joined per socket id for cleanup; do not store API keys
-socket_rooms = {}
-
 # Directory for ABC songs
 ABC_DIR = Path(__file__).resolve().parent / 'abc'
+# Canonical ABC_DIR, resolved once for path-safety checks in get_song
+ABC_DIR_RESOLVED = ABC_DIR.resolve()
+# Browser cache lifetime (seconds) for served .abc files
+ABC_CACHE_MAX_AGE = 3600
+# Bytes read from each .abc file when looking for its T: (title) header
+ABC_HEADER_PEEK_BYTES = 512
+# Song list from the last scan of ABC_DIR, keyed by the directory mtime
+_songs_cache = {'mtime': None, 'songs': []}
 # Path where the React build will be copied in Docker
 FRONTEND_BUILD_DIR = Path(__file__).resolve().parent / 'static'
+# The build is immutable at runtime, so index its files once at startup
+_frontend_files = {
+    p.relative_to(FRONTEND_BUILD_DIR).as_posix()
+    for p in FRONTEND_BUILD_DIR.rglob('*') if p.is_file()
+} if FRONTEND_BUILD_DIR.is_dir() else set()
+# index.html is served from memory for every SPA route; browsers revalidate via ETag
+_INDEX_HTML = (FRONTEND_BUILD_DIR / 'index.html').read_bytes() if 'index.html' in _frontend_files else None
+_INDEX_HTML_ETAG = hashlib.sha1(_INDEX_HTML).hexdigest() if _INDEX_HTML is not None else None
+# Build assets with a content hash in the name (e.g. main.1a2b3c4d.js) are cacheable forever
+_HASHED_ASSET_RE = re.compile(r'\.[0-9a-f]{8,}\.')
+HASHED_ASSET_MAX_AGE = 31536000
+# Path prefixes that serve_frontend must not handle
+_API_PREFIXES = ('api/', 'webhook/')
+
+# Pool of EventMobi clients keyed by API key so their HTTP sessions (and
+# keep-alive connections) are reused across requests. Idle entries are evicted
+# so rotated keys don't linger.
+CLIENT_POOL_MAXSIZE = 256
+CLIENT_POOL_IDLE_TTL = 15 * 60
+_client_pool = {}  # api_key -> (client, last_used)
+_client_pool_lock = threading.Lock()
+
+
+def _get_client(api_key):
+    """Return a pooled EventMobiClient for the given API key"""
+    now = time.monotonic()
+    with _client_pool_lock:
+        entry = _client_pool.get(api_key)
+        if entry is not None:
+            client = entry[0]
+        else:
+            # Evict idle clients, then the least recently used if still full
+            for key, (_, last_used) in list(_client_pool.items()):
+                if now - last_used > CLIENT_POOL_IDLE_TTL:
+                    del _client_pool[key]
+            if len(_client_pool) >= CLIENT_POOL_MAXSIZE:
+                oldest = min(_client_pool, key=lambda k: _client_pool[k][1])
+                del _client_pool[oldest]
+            client = EventMobiClient(api_key)
+        _client_pool[api_key] = (client, now)
+    return client
+
+
+def _api_key(req):
+    """Extract the API key from a Bearer Authorization header or the api_key query param"""
+    auth = req.headers.get('Authorization')
+    if auth:
+        key = auth[7:] if auth.startswith('Bearer ') else auth
+        if key:
+            return key
+    return req.args.get('api_key')
+
+
+# Check-in derived data (stats, session counts) is cached by each pooled client,
+# which also collapses bursts of refetches after a poke into one upstream call;
+# see EventMobiClient._cached()
+def _invalidate_checkin_cache(event_id):
+    """Drop cached check-in data for an event (e.g. after a checkins webhook)"""
+    with _client_pool_lock:
+        clients = [client for client, _ in _client_pool.values()]
+    for client in clients:
+        client.invalidate(event_id)
+
+
+# Resolved check-in messages. A checkin doesn't change once created, and every
+# client watching an event asks for the same one after a poke.
+CHECKIN_MESSAGE_CACHE_SIZE = 1024
+CHECKIN_MESSAGE_CACHE_TTL = 600
+_checkin_message_cache = OrderedDict()  # (api_key, event_id, checkin_id) -> (message, timestamp)
+_checkin_message_inflight = {}  # key -> lock held while the message is being resolved
+_checkin_message_lock = threading.Lock()
+
+
+def _room_has_subscribers(event_id):
+    """Whether any socket has joined the event's room on the default namespace"""
+    return bool(socketio.server.manager.rooms.get('/', {}).get(str(event_id)))
+
+
+# Check-in pokes are debounced per event: webhooks arriving within
+# POKE_DEBOUNCE_SECONDS are merged into a single emit to the event room
+POKE_DEBOUNCE_SECONDS = 0.5
+_pending_pokes = {}  # room -> merged poke payload
+_pending_pokes_lock = threading.Lock()
+
+
+def _queue_poke(event_id, timestamp, resource_ids):
+    """Merge a check-in into the event's pending poke, scheduling a flush if needed"""
+    # Form posts and scalar JSON values carry a single ID, not a list to merge element-wise
+    if not isinstance(resource_ids, (list, tuple)):
+        resource_ids = [resource_ids] if resource_ids else []
+    room = str(event_id)
+    with _pending_pokes_lock:
+        pending = _pending_pokes.get(room)
+        if pending is None:
+            _pending_pokes[room] = {
+                'event_id': event_id,
+                'timestamp': timestamp,
+                'resource_ids': list(resource_ids)
+            }
+            socketio.start_background_task(_flush_poke, room)
+        else:
+            pending['resource_ids'].extend(resource_ids)
+            if timestamp:
+                pending['timestamp'] = timestamp
+
+
+def _flush_poke(room):
+    """Emit the merged poke for a room once the debounce window has passed"""
+    socketio.sleep(POKE_DEBOUNCE_SECONDS)
+    with _pending_pokes_lock:
+        payload = _pending_pokes.pop(room, None)
+    if payload:
+        try:
+            socketio.emit('checkin_poke', payload, to=room)
+        except Exception as emit_err:
+            logger.debug("Error broadcasting checkin poke: %s", emit_err)
 
 
 @app.route('/api/setup', methods=['POST'])
@@ -56,7 +204,7 @@ def setup():
         if not api_key:
             return jsonify({'error': 'API key is required'}), 400
         
-        client = EventMobiClient(api_key)
+        client = _get_client(api_key)
         
         # Try to validate and get events
         try:
@@ -68,30 +216,24 @@ def setup():
         except ValueError:
             return jsonify({'error': 'Invalid API key'}), 401
         except Exception as e:
-            import traceback
-            debug_print(f"Error fetching events: {e}")
-            traceback.print_exc()
+            logger.exception("Error fetching events")
             return jsonify({'error': f'Failed to fetch events: {str(e)}'}), 500
             
     except Exception as e:
-        import traceback
-        debug_print(f"Error in setup endpoint: {e}")
-        traceback.print_exc()
+        logger.exception("Error in setup endpoint")
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
 
 @app.route('/api/events', methods=['GET'])
 def get_events():
     """List events for authenticated API key"""
-    api_key = request.headers.get('Authorization', '').replace('Bearer ', '')
-    if not api_key:
-        api_key = request.args.get('api_key')
+    api_key = _api_key(request)
     
     if not api_key:
         return jsonify({'error': 'API key is required'}), 401
     
     try:
-        client = EventMobiClient(api_key)
+        client = _get_client(api_key)
         events = client.get_events()
         return jsonify({'events': events})
     except Exception as e:
@@ -101,15 +243,13 @@ def get_events():
 @app.route('/api/event/<event_id>/details', methods=['GET'])
 def get_event_details(event_id):
     """Get event details including name"""
-    api_key = request.headers.get('Authorization', '').replace('Bearer ', '')
-    if not api_key:
-        api_key = request.args.get('api_key')
+    api_key = _api_key(request)
     
     if not api_key:
         return jsonify({'error': 'API key is required'}), 401
     
     try:
-        client = EventMobiClient(api_key)
+        client = _get_client(api_key)
         event_data = client.get_event_details(event_id)
         
         # Extract event details - API might return data wrapped or directly
@@ -138,15 +278,13 @@ def get_event_details(event_id):
 @app.route('/api/event/<event_id>/stats', methods=['GET'])
 def get_event_stats(event_id):
     """Get current statistics for an event"""
-    api_key = request.headers.get('Authorization', '').replace('Bearer ', '')
-    if not api_key:
-        api_key = request.args.get('api_key')
+    api_key = _api_key(request)
     
     if not api_key:
         return jsonify({'error': 'API key is required'}), 401
     
     try:
-        client = EventMobiClient(api_key)
+        client = _get_client(api_key)
         stats = client.get_event_stats(event_id)
         return jsonify(stats)
     except Exception as e:
@@ -156,17 +294,15 @@ def get_event_stats(event_id):
 @app.route('/api/event/<event_id>/active-sessions', methods=['GET'])
 def get_active_sessions(event_id):
     """Get active sessions (happening now or starting in next 30 minutes) with check-in counts"""
-    api_key = request.headers.get('Authorization', '').replace('Bearer ', '')
-    if not api_key:
-        api_key = request.args.get('api_key')
+    api_key = _api_key(request)
     
     if not api_key:
         return jsonify({'error': 'API key is required'}), 401
     
     try:
-        client = EventMobiClient(api_key)
+        client = _get_client(api_key)
         
-        active_sessions = client.get_active_sessions(event_id)
+        active_sessions = client.get_active_sessions(event_id, fast=Config.FAST_SESSION_COUNTS)
         return jsonify(active_sessions)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -176,22 +312,25 @@ def get_active_sessions(event_id):
 def list_songs():
     """List available .abc songs from backend/abc."""
     try:
-        songs = []
         if not ABC_DIR.exists():
-            return jsonify(songs)
+            return jsonify([])
+        # Reuse the previous scan while the directory is unchanged
+        mtime = ABC_DIR.stat().st_mtime
+        if _songs_cache['mtime'] == mtime:
+            return jsonify(_songs_cache['songs'])
+        songs = []
         for p in sorted(ABC_DIR.glob('*.abc')):
             filename = p.name
             # Derive a friendly name from ABC header T: if present, else filename without extension
             title = None
             try:
-                with p.open('r', encoding='utf-8', errors='ignore') as f:
-                    for _ in range(10):
-                        line = f.readline()
-                        if not line:
-                            break
-                        if line.startswith('T:'):
-                            title = line[2:].strip()
-                            break
+                # Single read of the file head instead of line-by-line reads
+                with p.open('rb') as f:
+                    head = f.read(ABC_HEADER_PEEK_BYTES).decode('utf-8', 'ignore')
+                for line in head.splitlines()[:10]:
+                    if line.startswith('T:'):
+                        title = line[2:].strip()
+                        break
             except Exception:
                 title = None
             songs.append({
@@ -199,6 +338,8 @@ def list_songs():
                 'name': title or p.stem.replace('_', ' '),
                 'filename': filename,
             })
+        _songs_cache['mtime'] = mtime
+        _songs_cache['songs'] = songs
         return jsonify(songs)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -212,8 +353,8 @@ def get_song(filename):
         if not filename.lower().endswith('.abc'):
             return jsonify({'error': 'Invalid file type'}), 400
         # Resolve path safely within ABC_DIR
-        candidate = (ABC_DIR / filename).resolve()
-        if not str(candidate).startswith(str(ABC_DIR.resolve())):
+        candidate = (ABC_DIR_RESOLVED / filename).resolve()
+        if not candidate.is_relative_to(ABC_DIR_RESOLVED):
             return jsonify({'error': 'Invalid path'}), 400
         if not candidate.exists() or not candidate.is_file():
             return jsonify({'error': 'Not found'}), 404
@@ -223,13 +364,36 @@ def get_song(filename):
                 return jsonify({'error': 'File too large'}), 413
         except Exception:
             pass
-        content = candidate.read_text(encoding='utf-8', errors='ignore')
-        # Return as plain text so frontend can parse
-        return app.response_class(content, mimetype='text/plain; charset=utf-8')
+        # Return as plain text so frontend can parse; send_from_directory streams
+        # the file and handles ETag/Last-Modified so repeat loads get a 304
+        return send_from_directory(
+            ABC_DIR_RESOLVED,
+            candidate.relative_to(ABC_DIR_RESOLVED).as_posix(),
+            mimetype='text/plain',
+            max_age=ABC_CACHE_MAX_AGE,
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _verify_webhook(client, event_id):
+    """Log the checkins webhooks registered for an event (background verification)"""
+    try:
+        webhooks = client._make_request('GET', f'events/{event_id}/webhooks', params={'type': 'checkins'})
+        webhook_list = []
+        if isinstance(webhooks, list):
+            webhook_list = webhooks
+        elif isinstance(webhooks, dict):
+            webhook_list = webhooks.get('data', []) or webhooks.get('webhooks', [])
+        
+        logger.debug("Verified: Found %d checkins webhook(s)", len(webhook_list))
+        for wh in webhook_list:
+            if wh.get('type') == 'checkins':
+                logger.debug("  - Webhook ID: %s, Enabled: %s, URL: %s", wh.get('id'), wh.get('enabled'), wh.get('callback_url'))
+    except Exception as verify_err:
+        logger.debug("Could not verify webhook: %s", verify_err)
+
+
 @app.route('/api/event/<event_id>/register-webhook', methods=['POST'])
 def register_webhook(event_id):
     """Register webhook with EventMobi for an event"""
@@ -243,12 +407,12 @@ def register_webhook(event_id):
     webhook_url = urljoin(webhook_base_url.rstrip('/') + '/', 'webhook/eventmobi')
     
     try:
-        client = EventMobiClient(api_key)
+        client = _get_client(api_key)
         
         # Register webhook for checkins
-        debug_print(f"Attempting to register webhook: type=checkins, url={webhook_url}")
+        logger.debug("Attempting to register webhook: type=checkins, url=%s", webhook_url)
         result = client.register_webhook(event_id, webhook_url, 'checkins')
-        debug_print(f"Webhook registration result: {result}")
+        logger.debug("Webhook registration result: %s", result)
         
         # Verify webhook was created/updated by listing webhooks
         webhook_id = None
@@ -262,21 +426,10 @@ def register_webhook(event_id):
                 webhook_id = result['id']
                 webhook_enabled = result.get('enabled', True)
         
-        # Double-check by listing webhooks
-        try:
-            webhooks = client._make_request('GET', f'events/{event_id}/webhooks', params={'type': 'checkins'})
-            webhook_list = []
-            if isinstance(webhooks, list):
-                webhook_list = webhooks
-            elif isinstance(webhooks, dict):
-                webhook_list = webhooks.get('data', []) or webhooks.get('webhooks', [])
-            
-            debug_print(f"Verified: Found {len(webhook_list)} checkins webhook(s)")
-            for wh in webhook_list:
-                if wh.get('type') == 'checkins':
-                    debug_print(f"  - Webhook ID: {wh.get('id')}, Enabled: {wh.get('enabled')}, URL: {wh.get('callback_url')}")
-        except Exception as verify_err:
-            debug_print(f"Could not verify webhook: {verify_err}")
+        # Double-check by listing webhooks (debug output only), off the request
+        # path, unless the registration result already confirms an enabled webhook
+        if APP_DEBUG and not (webhook_id and webhook_enabled):
+            socketio.start_background_task(_verify_webhook, client, event_id)
         
         return jsonify({
             'success': True,
@@ -286,10 +439,8 @@ def register_webhook(event_id):
             'result': result
         })
     except Exception as e:
-        import traceback
         error_msg = str(e)
-        debug_print(f"Webhook registration error: {error_msg}")
-        traceback.print_exc()
+        logger.exception("Webhook registration error")
         
         # Return error but don't fail completely - webhook might already be configured
         return jsonify({
@@ -306,24 +457,28 @@ def receive_webhook():
     try:
         # Handle GET requests (webhook verification from EventMobi)
         if request.method == 'GET':
-            debug_print("Webhook endpoint accessed via GET (verification)")
+            logger.debug("Webhook endpoint accessed via GET (verification)")
             return jsonify({'status': 'ok', 'message': 'Webhook endpoint is active'}), 200
         
         # Handle POST requests (actual webhook events)
-        debug_print(f"Webhook received! Headers: {dict(request.headers)}")
-        debug_print(f"Content-Type: {request.content_type}")
-        debug_print(f"Raw data: {request.data[:500] if request.data else 'No data'}")
-        
-        webhook_data = request.get_json()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Webhook received! Headers: %s", dict(request.headers))
+            logger.debug("Content-Type: %s", request.content_type)
+            logger.debug("Raw data: %s", request.data[:500] if request.data else 'No data')
         
-        if not webhook_data:
+        # Parse the body once, according to its content type
+        if request.is_json:
+            body = request.get_data(cache=False)
+            webhook_data = orjson.loads(body) if body else None
+        else:
             # Some webhooks might send form data
             webhook_data = request.form.to_dict()
-            if not webhook_data:
-                debug_print("No JSON or form data found")
-                return jsonify({'error': 'No data received'}), 400
         
-        debug_print(f"Webhook data received: {webhook_data}")
+        if not webhook_data:
+            logger.debug("No JSON or form data found")
+            return jsonify({'error': 'No data received'}), 400
+        
+        logger.debug("Webhook data received: %s", webhook_data)
         
         # Process webhook
         event_id = webhook_data.get('event_id')
@@ -331,52 +486,44 @@ def receive_webhook():
 
         # For checkins, emit a lightweight poke to the event room; clients will refetch
         if event_id and webhook_type == 'checkins':
+            # New check-in: make sure clients refetching after the poke get fresh data
+            _invalidate_checkin_cache(event_id)
+            # Nobody is watching this event: skip building and emitting the poke
+            if not _room_has_subscribers(event_id):
+                return jsonify({'success': True, 'message': 'No subscribers for event'}), 200
             try:
-                payload = {
-                    'event_id': event_id,
-                    'timestamp': webhook_data.get('change_datetime') or webhook_data.get('timestamp'),
-                    'resource_ids': webhook_data.get('resource_ids') or []
-                }
-                # Poke for clients to refetch
-                socketio.emit('checkin_poke', payload, to=str(event_id))
+                # Poke for clients to refetch (coalesced with other check-ins for this event)
+                _queue_poke(
+                    event_id,
+                    webhook_data.get('change_datetime') or webhook_data.get('timestamp'),
+                    webhook_data.get('resource_ids') or []
+                )
                 return jsonify({'success': True, 'message': 'Webhook broadcast sent'}), 200
             except Exception as emit_err:
-                debug_print(f"Error broadcasting checkin poke: {emit_err}")
+                logger.debug("Error broadcasting checkin poke: %s", emit_err)
                 return jsonify({'success': False, 'message': 'Webhook received but broadcast failed'}), 200
 
         # For non-checkin or missing event_id, ignore gracefully
-        debug_print(f"Webhook ignored or unsupported. Data: {webhook_data}")
+        logger.debug("Webhook ignored or unsupported. Data: %s", webhook_data)
         return jsonify({'success': False, 'message': 'Webhook ignored'}), 200
             
     except Exception as e:
-        debug_print(f"Error processing webhook: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error processing webhook")
         return jsonify({'error': str(e)}), 500
 
 
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
-    debug_print('Client connected')
+    logger.debug('Client connected')
     emit('connected', {'message': 'Connected to EventMobi dashboard'})
 
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
-    debug_print('Client disconnected')
-    # Cleanup joined rooms tracking if present
-    sid = request.sid
-    if sid in socket_rooms:
-        try:
-            for room_id in socket_rooms[sid]:
-                try:
-                    leave_room(room_id)
-                except Exception:
-                    pass
-        finally:
-            del socket_rooms[sid]
+    logger.debug('Client disconnected')
+    # Socket.IO removes the sid from all of its rooms on disconnect
 
 
 @socketio.on('subscribe')
@@ -385,8 +532,6 @@ def handle_subscribe(data):
     event_id = data.get('event_id')
     if event_id:
         join_room(str(event_id))
-        sid = request.sid
-        socket_rooms.setdefault(sid, set()).add(str(event_id))
         emit('subscribed', {'event_id': event_id})
 
 @socketio.on('unsubscribe')
@@ -395,24 +540,110 @@ def handle_unsubscribe(data):
     event_id = data.get('event_id')
     if event_id:
         leave_room(str(event_id))
-        sid = request.sid
-        if sid in socket_rooms and str(event_id) in socket_rooms[sid]:
-            socket_rooms[sid].discard(str(event_id))
-            if not socket_rooms[sid]:
-                del socket_rooms[sid]
 
 @app.route('/api/health', methods=['GET'])
 def health():
     return jsonify({'status': 'ok'}), 200
 
+def _resolve_checkin(client, event_id, checkin_id):
+    """Fetch a checkin and build its bubble message; returns None if not found"""
+    # Fetch specific checkin with person info
+    checkin_data = client._make_request('GET', f'events/{event_id}/checkin', params={'id': checkin_id, 'include': 'person'})
+    checkin = None
+    if isinstance(checkin_data, list) and checkin_data:
+        checkin = checkin_data[0]
+    elif isinstance(checkin_data, dict):
+        if 'data' in checkin_data:
+            data = checkin_data['data']
+            if isinstance(data, list) and data:
+                checkin = data[0]
+            elif isinstance(data, dict):
+                checkin = data
+        elif 'checkins' in checkin_data:
+            data = checkin_data['checkins']
+            if isinstance(data, list) and data:
+                checkin = data[0]
+            elif isinstance(data, dict):
+                checkin = data
+
+    if not checkin:
+        return None
+
+    person = checkin.get('person') or {}
+    first_name = (person.get('first_name') or '').strip()
+    last_name = (person.get('last_name') or '').strip()
+    attendee_name = first_name or (person.get('name', '').split(' ')[0] if person.get('name') else '')
+    if not attendee_name and person.get('email'):
+        # Avoid exposing email fully; take prefix only if needed
+        attendee_name = person.get('email').split('@')[0]
+    if not attendee_name:
+        attendee_name = 'Someone'
+
+    entity_type = checkin.get('entity_type')
+    entity_id = checkin.get('entity_id')
+    checkin_type = 'session' if entity_type == 'sessions' else 'event'
+    location_name = 'your event'
+    if checkin_type == 'session' and entity_id:
+        try:
+            # The session lookup depends on the checkin's entity_id, so it can't be
+            # overlapped with the checkin fetch; the client caches it per session instead
+            session = client.get_session(event_id, entity_id)
+            if session:
+                location_name = session.get('name') or session.get('title') or 'a session'
+            else:
+                location_name = 'a session'
+        except Exception:
+            location_name = 'a session'
+
+    message = f"{attendee_name} just checked into session \"{location_name}\"" if checkin_type == 'session' else f"{attendee_name} just checked into your event"
+
+    return {
+        'message': message,
+        'event_type': 'checkin',
+        'attendee_name': attendee_name,
+        'checkin_type': checkin_type,
+        'location_name': location_name,
+        'timestamp': checkin.get('change_datetime'),
+        'session_id': entity_id if checkin_type == 'session' else None
+    }
+
+
+def _get_checkin_message(api_key, event_id, checkin_id):
+    """Cached _resolve_checkin; concurrent lookups of the same checkin share one fetch"""
+    key = (api_key, str(event_id), str(checkin_id))
+    with _checkin_message_lock:
+        hit = _checkin_message_cache.get(key)
+        if hit is not None and time.monotonic() - hit[1] < CHECKIN_MESSAGE_CACHE_TTL:
+            _checkin_message_cache.move_to_end(key)
+            return hit[0]
+        key_lock = _checkin_message_inflight.setdefault(key, threading.Lock())
+
+    with key_lock:
+        # Another request may have resolved it while we waited
+        hit = _checkin_message_cache.get(key)
+        if hit is not None and time.monotonic() - hit[1] < CHECKIN_MESSAGE_CACHE_TTL:
+            return hit[0]
+        try:
+            message = _resolve_checkin(_get_client(api_key), event_id, checkin_id)
+            # Don't cache misses: a brand-new checkin may not be readable yet
+            if message is not None:
+                with _checkin_message_lock:
+                    _checkin_message_cache[key] = (message, time.monotonic())
+                    _checkin_message_cache.move_to_end(key)
+                    while len(_checkin_message_cache) > CHECKIN_MESSAGE_CACHE_SIZE:
+                        _checkin_message_cache.popitem(last=False)
+            return message
+        finally:
+            with _checkin_message_lock:
+                _checkin_message_inflight.pop(key, None)
+
+
 @app.route('/api/event/<event_id>/checkin-message', methods=['GET'])
 def get_checkin_message(event_id):
     """Build a privacy-friendly check-in message using client's API key.
     Expects query param id=<checkin_id> and optional include person/session details.
     """
-    api_key = request.headers.get('Authorization', '').replace('Bearer ', '')
-    if not api_key:
-        api_key = request.args.get('api_key')
+    api_key = _api_key(request)
     checkin_id = request.args.get('id')
     if not api_key:
         return jsonify({'error': 'API key is required'}), 401
@@ -420,69 +651,10 @@ def get_checkin_message(event_id):
         return jsonify({'error': 'checkin id is required'}), 400
 
     try:
-        client = EventMobiClient(api_key)
-        # Fetch specific checkin with person info
-        checkin_data = client._make_request('GET', f'events/{event_id}/checkin', params={'id': checkin_id, 'include': 'person'})
-        checkin = None
-        if isinstance(checkin_data, list) and checkin_data:
-            checkin = checkin_data[0]
-        elif isinstance(checkin_data, dict):
-            if 'data' in checkin_data:
-                data = checkin_data['data']
-                if isinstance(data, list) and data:
-                    checkin = data[0]
-                elif isinstance(data, dict):
-                    checkin = data
-            elif 'checkins' in checkin_data:
-                data = checkin_data['checkins']
-                if isinstance(data, list) and data:
-                    checkin = data[0]
-                elif isinstance(data, dict):
-                    checkin = data
-
-        if not checkin:
+        message = _get_checkin_message(api_key, event_id, checkin_id)
+        if message is None:
             return jsonify({'error': 'Checkin not found'}), 404
-
-        person = checkin.get('person') or {}
-        first_name = (person.get('first_name') or '').strip()
-        last_name = (person.get('last_name') or '').strip()
-        attendee_name = first_name or (person.get('name', '').split(' ')[0] if person.get('name') else '')
-        if not attendee_name and person.get('email'):
-            # Avoid exposing email fully; take prefix only if needed
-            attendee_name = person.get('email').split('@')[0]
-        if not attendee_name:
-            attendee_name = 'Someone'
-
-        entity_type = checkin.get('entity_type')
-        entity_id = checkin.get('entity_id')
-        checkin_type = 'session' if entity_type == 'sessions' else 'event'
-        location_name = 'your event'
-        if checkin_type == 'session' and entity_id:
-            try:
-                session_data = client._make_request('GET', f'events/{event_id}/sessions', params={'id': entity_id})
-                session = None
-                if isinstance(session_data, dict) and session_data.get('data'):
-                    session = session_data['data'][0]
-                elif isinstance(session_data, list) and session_data:
-                    session = session_data[0]
-                if isinstance(session, dict):
-                    location_name = session.get('name') or session.get('title') or 'a session'
-                else:
-                    location_name = 'a session'
-            except Exception:
-                location_name = 'a session'
-
-        message = f"{attendee_name} just checked into session \"{location_name}\"" if checkin_type == 'session' else f"{attendee_name} just checked into your event"
-
-        return jsonify({
-            'message': message,
-            'event_type': 'checkin',
-            'attendee_name': attendee_name,
-            'checkin_type': checkin_type,
-            'location_name': location_name,
-            'timestamp': checkin.get('change_datetime'),
-            'session_id': entity_id if checkin_type == 'session' else None
-        })
+        return jsonify(message)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -491,17 +663,23 @@ def get_checkin_message(event_id):
 @app.route('/<path:path>')
 def serve_frontend(path):
     # Do not intercept API or webhook endpoints
-    if path.startswith('api/') or path.startswith('webhook/'):
+    if path.startswith(_API_PREFIXES):
         return jsonify({'error': 'Not found'}), 404
-    try:
-        if path and (FRONTEND_BUILD_DIR / path).is_file():
-            return send_from_directory(FRONTEND_BUILD_DIR, path)
-    except Exception:
-        pass
+    if path in _frontend_files:
+        resp = send_from_directory(FRONTEND_BUILD_DIR, path)
+        if _HASHED_ASSET_RE.search(path):
+            # Content-hashed bundles never change under the same name
+            resp.cache_control.no_cache = None
+            resp.cache_control.public = True
+            resp.cache_control.max_age = HASHED_ASSET_MAX_AGE
+            resp.cache_control.immutable = True
+        return resp
     # Fallback to index.html for SPA routing
-    index_path = FRONTEND_BUILD_DIR / 'index.html'
-    if index_path.exists():
-        return send_from_directory(FRONTEND_BUILD_DIR, 'index.html')
+    if _INDEX_HTML is not None:
+        resp = app.response_class(_INDEX_HTML, mimetype='text/html')
+        resp.set_etag(_INDEX_HTML_ETAG)
+        resp.cache_control.no_cache = True
+        return resp.make_conditional(request)
     return jsonify({'message': 'Frontend not built'}), 200
 
 
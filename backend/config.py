@@ -8,6 +8,13 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     # EventMobi API base URL - according to Swagger docs, this is the Unified API URL
     EVENTMOBI_API_BASE_URL = os.environ.get('EVENTMOBI_API_BASE_URL', 'https://uapi.eventmobi.com')
+    # Log every EventMobi request and response (read once at startup)
+    EVENTMOBI_DEBUG = os.environ.get('EVENTMOBI_DEBUG', 'false').lower() == 'true'
     CORS_ORIGINS = [o.strip() for o in os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(',') if o.strip()]
     WEBHOOK_BASE_URL = os.environ.get('WEBHOOK_BASE_URL', 'http://localhost:5001')
-
+    # Socket.IO async backend: 'gevent' (default), 'eventlet' or 'threading'
+    SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'gevent')
+    # Per-event Socket.IO logging is off unless explicitly enabled
+    SOCKETIO_LOGGER = os.environ.get('SOCKETIO_LOGGER', 'false').lower() == 'true'
+    # Let the session check-in scan fallback stop early once counts stop growing (approximate)
+    FAST_SESSION_COUNTS = os.environ.get('FAST_SESSION_COUNTS', 'false').lower() == 'true'
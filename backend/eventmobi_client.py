@@ -1,20 +1,272 @@
 import requests
-import os
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+import heapq
+import logging
+import math
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from backend.config import Config
 
+logger = logging.getLogger(__name__)
+if Config.EVENTMOBI_DEBUG:
+    logger.setLevel(logging.DEBUG)
+
+# Seconds a single-session lookup (get_session) is reused
+SESSION_CACHE_TTL = 300
+# Seconds an event's session list is reused by get_sessions
+SESSIONS_CACHE_TTL = 15
+# Seconds per-session check-in counts are reused (dropped early by invalidate())
+CHECKIN_COUNTS_CACHE_TTL = 15
+# Seconds a validate_api_key() result is reused (e.g. by repeated health checks)
+API_KEY_VALIDATION_TTL = 60
+# Seconds event stats totals are reused (dropped early by invalidate())
+STATS_CACHE_TTL = 30
+# Most entries in a client's response cache; the least recently used are dropped first
+RESPONSE_CACHE_SIZE = 256
+# Cache kinds derived from check-ins, i.e. dropped by invalidate()
+CHECKIN_CACHE_KINDS = frozenset({'session_checkins', 'event_stats'})
+# Threads shared by all clients for concurrent API requests (page fan-out, prefetches)
+REQUEST_WORKERS = 32
+# Pages of one listing in flight at a time once its total is known
+PAGE_FETCH_WINDOW = 8
+# Page size for paginated list endpoints
+PAGE_LIMIT = 1000
+# Smallest row projection for limit=1 requests made only for meta.pagination totals
+COUNT_PROJECTION = {'fields': 'id'}
+# Query for scanning every session check-in, with person data to get person_id
+SESSION_CHECKIN_SCAN_PARAMS = {'entity_type': 'sessions', 'include': 'person'}
+# In fast mode, the check-in scan stops after this many pages without a new attendee
+SCAN_STALL_PAGES = 2
+# Retries for transient failures (429/502/503/504, connection errors) on idempotent methods
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.3
+# Upper bound in seconds for a single backoff sleep (a Retry-After header still wins)
+RETRY_BACKOFF_MAX = 5
+# Consecutive 5xx/timeout/connection failures before a client fails fast
+CIRCUIT_FAILURE_THRESHOLD = 5
+# Seconds the circuit stays open before a single probe request is let through
+CIRCUIT_COOLDOWN = 30
+
+
+class EventMobiRequestError(Exception):
+    """A request rejected by the EventMobi API with a 4xx status (other than 401/404)"""
+    
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _JitteredRetry(Retry):
+    """Retry with full jitter: sleep a random time up to the exponential backoff"""
+    
+    def get_backoff_time(self) -> float:
+        return random.uniform(0, min(RETRY_BACKOFF_MAX, super().get_backoff_time()))
+
+
+def _build_session() -> requests.Session:
+    """Create an HTTP session with a keep-alive connection pool"""
+    session = requests.Session()
+    # The session is shared across API keys, so never persist cookies between requests
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    # All traffic goes to one API host, so few host pools but many connections each
+    # Transient errors are retried on idempotent methods only; 401/404 are never retried.
+    # Read timeouts are not retried (each already took the full timeout), and the last
+    # response is returned rather than raised so _make_request maps it as before.
+    retry = _JitteredRetry(
+        total=RETRY_TOTAL,
+        read=False,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'PUT', 'DELETE', 'PATCH'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=64, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Only ever runs single requests (or a count and its plain refetch), never work that waits
+# on other submitted requests, so tasks can't deadlock on the pool; bounded well under the
+# connection pool size
+_request_executor = ThreadPoolExecutor(max_workers=REQUEST_WORKERS, thread_name_prefix='eventmobi')
+
+
+class _SessionFilterIgnored(Exception):
+    """The check-in endpoint returned records outside the requested entity_id"""
+
+
+def _person_key(person_id):
+    """Set key for a person ID when counting unique attendees. Numeric IDs are kept as ints,
+    half the size of their string form; anything else is compared as a string.
+    """
+    if isinstance(person_id, int):
+        return person_id
+    person_id = str(person_id)
+    if person_id.isdecimal() and (person_id[0] != '0' or person_id == '0'):
+        return int(person_id)
+    return person_id
+
+
+def _has_total_items_count(data) -> bool:
+    """Whether a list response reports meta.pagination.total_items_count"""
+    return isinstance(data, dict) and 'total_items_count' in data.get('meta', {}).get('pagination', {})
+
+
+def _total_items_count(data) -> int:
+    """Total item count from a list response's meta.pagination (0 if not reported)"""
+    if isinstance(data, dict):
+        return data.get('meta', {}).get('pagination', {}).get('total_items_count', 0)
+    return 0
+
+
+def _checkin_person_id(checkin: Dict):
+    """Person ID of a check-in record (from included person data or the record itself)"""
+    person = checkin.get('person') or {}
+    return person.get('id') or person.get('people_id') or checkin.get('person_id') or checkin.get('people_id')
+
 
 class EventMobiClient:
     """Client for interacting with EventMobi API v4"""
     
-    def __init__(self, api_key: str):
+    # Shared by all clients: constructing a client is cheap and connections are
+    # reused across API keys (auth headers are sent per request)
+    session = _build_session()
+    
+    def __init__(self, api_key: str, session: Optional[requests.Session] = None):
         self.api_key = api_key
+        # A dedicated session (e.g. for scripts) can be passed in; close() releases it
+        if session is not None:
+            self.session = session
         self.base_url = Config.EVENTMOBI_API_BASE_URL
         self.headers = {
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json',
             'Accept': 'application/vnd.eventmobi+json; version=4'
         }
+        # Whether checkin?entity_id= filtering works; None until first tried
+        self._session_filter_supported = None
+        # Per list resource ('people', 'checkin'): whether count requests may ask for
+        # COUNT_PROJECTION; missing until first tried
+        self._count_projection_supported = {}
+        # Parsed session datetimes keyed by the raw ISO string; see _parse_iso()
+        self._dt_cache = {}
+        # Short-lived LRU response cache: key -> (stored_at, value); see _cached()
+        self._cache = OrderedDict()
+        self._cache_inflight = {}  # key -> lock held while the value is being computed
+        # Bumped by invalidate(), so fetches started before it don't store stale values
+        self._cache_generation = 0
+        self._cache_lock = threading.Lock()
+        # Circuit breaker state; see _circuit_check() and _circuit_record()
+        self._cb_fail_count = 0
+        self._cb_open_until = 0.0
+        self._cb_lock = threading.Lock()
+    
+    def close(self) -> None:
+        """Release the client's own HTTP session (the shared session stays open)"""
+        if self.session is not EventMobiClient.session:
+            self.session.close()
+    
+    def __enter__(self) -> 'EventMobiClient':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    @staticmethod
+    def _unwrap(data, *keys: str) -> List[Dict]:
+        """Extract the item list from a response: either the list itself, or a dict
+        wrapping it under 'data' or one of the given keys
+        """
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict):
+            return data.get('data') or next((data[k] for k in keys if k in data), []) or []
+        return []
+    
+    def _cached(self, key: Tuple, ttl: float, fn: Callable[[], Any], cache_none: bool = True) -> Any:
+        """Return the value cached under key if younger than ttl, else compute and store it.
+        Keys are (kind, event_id, ...) tuples. Concurrent misses on the same key share one
+        call to fn (e.g. every dashboard refetching after a poke). Exceptions are not cached,
+        nor is None with cache_none=False.
+        """
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None and time.monotonic() - hit[0] < ttl:
+                self._cache.move_to_end(key)
+                return hit[1]
+            key_lock = self._cache_inflight.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            # Another thread may have computed it while we waited
+            with self._cache_lock:
+                hit = self._cache.get(key)
+                generation = self._cache_generation
+            if hit is not None and time.monotonic() - hit[0] < ttl:
+                return hit[1]
+            try:
+                value = fn()
+                with self._cache_lock:
+                    # A check-in invalidated the cache mid-fetch: the value may predate it,
+                    # so hand it to this caller but let the next one refetch
+                    if self._cache_generation != generation and key[0] in CHECKIN_CACHE_KINDS:
+                        return value
+                    if value is None and not cache_none:
+                        return value
+                    self._cache[key] = (time.monotonic(), value)
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > RESPONSE_CACHE_SIZE:
+                        self._cache.popitem(last=False)
+                return value
+            finally:
+                with self._cache_lock:
+                    self._cache_inflight.pop(key, None)
+    
+    def _has_cached(self, kind: str, event_id: str, ttl: float) -> bool:
+        """Whether any entry of this kind for the event is younger than ttl"""
+        now = time.monotonic()
+        with self._cache_lock:
+            return any(k[0] == kind and k[1] == event_id and now - stored_at < ttl
+                       for k, (stored_at, _) in self._cache.items())
+    
+    def invalidate(self, event_id: str) -> None:
+        """Drop cached check-in derived data for an event (e.g. after a checkins webhook)"""
+        event_id = str(event_id)
+        with self._cache_lock:
+            self._cache_generation += 1
+            for key in [k for k in self._cache if k[1] == event_id and k[0] in CHECKIN_CACHE_KINDS]:
+                del self._cache[key]
+    
+    def _circuit_check(self) -> None:
+        """Fail fast while the circuit is open; once the cooldown expires, let one probe through"""
+        with self._cb_lock:
+            if self._cb_fail_count < CIRCUIT_FAILURE_THRESHOLD:
+                return
+            now = time.monotonic()
+            if now < self._cb_open_until:
+                raise Exception("EventMobi circuit open - API is failing, not sending request")
+            # Half-open: this request is the probe, everyone else keeps failing fast
+            self._cb_open_until = now + CIRCUIT_COOLDOWN
+    
+    def _circuit_record(self, failed: bool) -> None:
+        """Record a request outcome: success closes the circuit, repeated failure opens it"""
+        with self._cb_lock:
+            if not failed:
+                self._cb_fail_count = 0
+                self._cb_open_until = 0.0
+                return
+            self._cb_fail_count += 1
+            if self._cb_fail_count >= CIRCUIT_FAILURE_THRESHOLD:
+                self._cb_open_until = time.monotonic() + CIRCUIT_COOLDOWN
     
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict:
         """Make HTTP request to EventMobi API"""
@@ -25,29 +277,37 @@ class EventMobiClient:
         if params:
             kwargs['params'] = params
             
-        # Debug logging (can be enabled via environment variable)
-        DEBUG_MODE = os.environ.get('EVENTMOBI_DEBUG', 'false').lower() == 'true'
-        if DEBUG_MODE:
-            print(f"DEBUG: Making {method} request to: {url}")
+        # Debug logging (EVENTMOBI_DEBUG); checked once since the response dump is costly to build
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Making %s request to: %s", method, url)
             if params:
-                print(f"DEBUG: Params: {params}")
-            print(f"DEBUG: Headers: {self.headers}")
+                logger.debug("Params: %s", params)
+            logger.debug("Headers: %s", self.headers)
         
+        self._circuit_check()
         try:
-            response = requests.request(method, url, headers=self.headers, timeout=30, **kwargs)
+            response = self.session.request(method, url, headers=self.headers, timeout=30, **kwargs)
+            # Only server-side failures count; a 4xx means the API itself is up
+            self._circuit_record(response.status_code >= 500)
             
-            if DEBUG_MODE:
-                print(f"DEBUG: Response status: {response.status_code}")
-                print(f"DEBUG: Response headers: {dict(response.headers)}")
-                print(f"DEBUG: Response text (first 1000 chars): {response.text[:1000]}")
+            if debug:
+                logger.debug("Response status: %s", response.status_code)
+                logger.debug("Response headers: %s", dict(response.headers))
+                logger.debug("Response text (first 1000 chars): %s", response.text[:1000])
             
             response.raise_for_status()
             
             # Handle empty responses
-            if not response.text.strip():
+            content = response.content
+            if not content.strip():
                 return {}
-                
-            return response.json()
+            
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError as e:
+                # Not a ValueError to callers (that means an invalid API key)
+                raise Exception(f"Invalid JSON response from EventMobi: {str(e)}")
         except requests.exceptions.HTTPError as e:
             # Get response text for debugging
             response_text = e.response.text[:500] if e.response.text else '(empty response)'
@@ -60,83 +320,126 @@ class EventMobiClient:
                 raise Exception(f"EventMobi server error: HTTP {e.response.status_code} - {response_text}")
             else:
                 try:
-                    error_data = e.response.json()
+                    error_data = orjson.loads(e.response.content)
                     error_msg = error_data.get('error') or error_data.get('message') or error_data.get('error_message') or str(e)
-                    raise Exception(f"API request failed: {error_msg}")
-                except (ValueError, requests.exceptions.JSONDecodeError):
+                    raise EventMobiRequestError(f"API request failed: {error_msg}", e.response.status_code)
+                except orjson.JSONDecodeError:
                     # If response is not JSON, return the raw text
-                    raise Exception(f"API request failed: HTTP {e.response.status_code} - {response_text}")
+                    raise EventMobiRequestError(f"API request failed: HTTP {e.response.status_code} - {response_text}", e.response.status_code)
         except requests.exceptions.Timeout:
+            self._circuit_record(True)
             raise Exception("Request timeout - EventMobi API is not responding")
         except requests.exceptions.RequestException as e:
+            self._circuit_record(True)
             raise Exception(f"Connection error: {str(e)}")
     
     def validate_api_key(self) -> bool:
-        """Validate the API key by attempting to fetch events"""
-        try:
-            self.get_events()
-            return True
-        except ValueError:
-            return False
+        """Validate the API key with a one-event request (result reused for a minute)"""
+        def check() -> bool:
+            try:
+                self._make_request('GET', 'events', params={'limit': 1})
+                return True
+            except ValueError:
+                return False
+        
+        return self._cached(('api_key_valid', None), API_KEY_VALIDATION_TTL, check)
     
     def get_events(self) -> List[Dict]:
         """Fetch list of events for the authenticated organization"""
         data = self._make_request('GET', 'events')
         # API might return events directly or wrapped in a response object
-        if isinstance(data, list):
-            return data
-        elif isinstance(data, dict) and 'data' in data:
-            return data['data']
-        elif isinstance(data, dict) and 'events' in data:
-            return data['events']
-        return []
+        return self._unwrap(data, 'events')
     
     def get_event_details(self, event_id: str) -> Dict:
         """Fetch details for a specific event"""
         return self._make_request('GET', f'events/{event_id}')
     
-    def get_attendees(self, event_id: str) -> List[Dict]:
-        """Fetch list of attendees (people) for an event with pagination"""
-        all_attendees = []
-        page = 0
-        limit = 1000  # Max items per page
+    def _iter_pages(self, endpoint: str, params: Dict, keys: Tuple[str, ...] = (),
+                    limit: int = PAGE_LIMIT, first_page: Optional[Future] = None) -> Iterator[List[Dict]]:
+        """Yield the items of each page of a paginated endpoint, in page order (see _unwrap for keys).
+        Page 0 is fetched first (or taken from first_page, a request already in flight); if it
+        reports meta.pagination.total_items_count the remaining pages are fetched concurrently,
+        otherwise pages are walked until a short page is returned.
+        """
+        def fetch(page: int) -> object:
+            return self._make_request('GET', endpoint, params={**params, 'page': page, 'limit': limit})
+        
+        def parse(data) -> List[Dict]:
+            return self._unwrap(data, *keys)
         
+        first = fetch(0) if first_page is None else first_page.result()
+        items = parse(first)
+        if not items:
+            return
+        yield items
+        if len(items) < limit:
+            return
+        
+        total = _total_items_count(first)
+        if total:
+            n_pages = math.ceil(total / limit)
+            # Keep a window of pages in flight; a caller that stops early leaves little to waste
+            next_page = 1
+            in_flight = deque()
+            try:
+                while in_flight or next_page < n_pages:
+                    while next_page < n_pages and len(in_flight) < PAGE_FETCH_WINDOW:
+                        in_flight.append(self._submit_page(endpoint, params, next_page, limit))
+                        next_page += 1
+                    items = parse(in_flight.popleft().result())
+                    if items:
+                        yield items
+            finally:
+                for future in in_flight:
+                    future.cancel()
+            return
+        
+        page = 1
         while True:
-            params = {'page': page, 'limit': limit}
-            data = self._make_request('GET', f'events/{event_id}/people', params=params)
-            
-            # Parse response
-            page_attendees = []
-            meta = {}
-            
-            if isinstance(data, list):
-                page_attendees = data
-                # If we get less than limit, we're done
-                if len(page_attendees) < limit:
-                    all_attendees.extend(page_attendees)
-                    break
-            elif isinstance(data, dict):
-                if 'data' in data:
-                    page_attendees = data['data']
-                    meta = data.get('meta', {})
-                elif 'people' in data:
-                    page_attendees = data['people']
-                elif 'attendees' in data:
-                    page_attendees = data['attendees']
-            
-            if not page_attendees:
+            items = parse(fetch(page))
+            if not items:
                 break
-                
-            all_attendees.extend(page_attendees)
-            
-            # Check if we've fetched all items
-            total_items = meta.get('pagination', {}).get('total_items_count', len(page_attendees))
-            if len(all_attendees) >= total_items or len(page_attendees) < limit:
+            yield items
+            if len(items) < limit:
                 break
-                
             page += 1
-        
-        return all_attendees
+    
+    def _submit_page(self, endpoint: str, params: Dict, page: int = 0, limit: int = PAGE_LIMIT) -> Future:
+        """Start fetching one page of a paginated endpoint on the shared request threads"""
+        return _request_executor.submit(
+            self._make_request, 'GET', endpoint, params={**params, 'page': page, 'limit': limit}
+        )
+    
+    def _fetch_count(self, endpoint: str, params: Dict) -> int:
+        """Total item count of a list endpoint from meta.pagination of a limit=1 page.
+        Asks for the COUNT_PROJECTION row until the API rejects it (400) or stops
+        reporting the total with it, then counts that resource without it from then on.
+        """
+        params = {**params, 'page': 0, 'limit': 1}
+        # Keyed by the resource, not the full path, so support is learned once for all events
+        resource = endpoint.rstrip('/').rsplit('/', 1)[-1]
+        if self._count_projection_supported.get(resource) is not False:
+            try:
+                data = self._make_request('GET', endpoint, params={**params, **COUNT_PROJECTION})
+            except EventMobiRequestError as e:
+                if e.status_code != 400:
+                    raise
+                data = None
+            if _has_total_items_count(data):
+                self._count_projection_supported[resource] = True
+                return _total_items_count(data)
+            logger.warning("Count projection not supported on %s, requesting full rows", endpoint)
+            self._count_projection_supported[resource] = False
+        return _total_items_count(self._make_request('GET', endpoint, params=params))
+    
+    def iter_attendees(self, event_id: str) -> Iterator[Dict]:
+        """Yield the attendees (people) of an event page by page, without holding them all"""
+        for page_attendees in self._iter_pages(f'events/{event_id}/people', {}, ('people', 'attendees')):
+            yield from page_attendees
+    
+    def get_attendees(self, event_id: str) -> List[Dict]:
+        """Fetch list of attendees (people) for an event with pagination"""
+        return list(self.iter_attendees(event_id))
     
     def get_checkins(self, event_id: str, session_id: Optional[str] = None) -> List[Dict]:
         """Fetch check-ins for an event or session by querying people with checkin_status filter"""
@@ -149,16 +452,7 @@ class EventMobiClient:
         # For event check-ins (not session-specific), we query without session_id
         # and filter out those with session check-ins
         data = self._make_request('GET', f'events/{event_id}/people', params=params)
-        if isinstance(data, list):
-            checkins = data
-        elif isinstance(data, dict) and 'data' in data:
-            checkins = data['data']
-        elif isinstance(data, dict) and 'people' in data:
-            checkins = data['people']
-        elif isinstance(data, dict) and 'checkins' in data:
-            checkins = data['checkins']
-        else:
-            return []
+        checkins = self._unwrap(data, 'people', 'checkins')
         
         # If no session_id specified, filter to only event check-ins (no session check-in)
         if not session_id:
@@ -172,24 +466,131 @@ class EventMobiClient:
         return checkins
     
     def get_sessions(self, event_id: str) -> List[Dict]:
-        """Fetch sessions for an event with settings and location included"""
-        # Include settings and location - capacity_limit may be in settings or location
-        # Note: capacity_limit is sortable but may not be returned in response
-        params = {'include': 'settings,location'}
-        data = self._make_request('GET', f'events/{event_id}/sessions', params=params)
-        if isinstance(data, list):
-            return data
-        elif isinstance(data, dict) and 'data' in data:
-            return data['data']
-        elif isinstance(data, dict) and 'sessions' in data:
-            return data['sessions']
-        return []
+        """Fetch sessions for an event with location included (cached briefly)"""
+        def fetch() -> List[Dict]:
+            # Include location for its label. Settings are not included: nothing reads them,
+            # capacity comes from the session's own capacity/capacity_limit fields.
+            # Note: capacity_limit is sortable but may not be returned in response
+            params = {'include': 'location'}
+            data = self._make_request('GET', f'events/{event_id}/sessions', params=params)
+            return self._unwrap(data, 'sessions')
+        
+        return self._cached(('sessions', str(event_id)), SESSIONS_CACHE_TTL, fetch)
     
-    def get_active_sessions(self, event_id: str) -> List[Dict]:
-        """Get sessions that are still on, starting within 30 minutes, or ended in the last 30 minutes (always up to 15 total, filled with last ended sessions if needed), with check-in counts"""
-        from datetime import datetime, timedelta, timezone
+    def get_session(self, event_id: str, session_id: str) -> Optional[Dict]:
+        """Fetch a single session; cached briefly since session details rarely change"""
+        def fetch() -> Optional[Dict]:
+            session_data = self._make_request('GET', f'events/{event_id}/sessions', params={'id': session_id})
+            session = None
+            if isinstance(session_data, dict) and session_data.get('data'):
+                session = session_data['data'][0]
+            elif isinstance(session_data, list) and session_data:
+                session = session_data[0]
+            return session if isinstance(session, dict) else None
+        
+        # Misses aren't cached: a brand-new session may not be readable yet
+        return self._cached(('session', str(event_id), str(session_id)), SESSION_CACHE_TTL, fetch,
+                            cache_none=False)
+    
+    def _count_session_checkins(self, event_id: str, session_id: str,
+                                first_page: Optional[Future] = None) -> int:
+        """Count unique attendees checked into one session via the entity_id filter"""
+        params = {**SESSION_CHECKIN_SCAN_PARAMS, 'entity_id': session_id}
+        people = set()
+        for page_checkins in self._iter_pages(f'events/{event_id}/checkin', params, ('checkins',),
+                                              first_page=first_page):
+            for checkin in page_checkins:
+                if isinstance(checkin, dict):
+                    if str(checkin.get('entity_id')) != str(session_id):
+                        # The API ignored the filter; counting this would be wrong
+                        raise _SessionFilterIgnored(f"got check-ins for {checkin.get('entity_id')} when filtering by {session_id}")
+                    person_id = _checkin_person_id(checkin)
+                    if person_id:
+                        people.add(_person_key(person_id))
+        return len(people)
+    
+    def _session_checkin_counts(self, event_id: str, session_ids: List[str],
+                                fast: bool = False, first_page: Optional[Future] = None) -> Dict[str, int]:
+        """Count unique attendees (people) who checked in per session, not check-in records.
+        Prefers the server-side entity_id filter (one query per session); falls back to
+        scanning every session check-in if the API rejects or ignores the filter.
+        With fast=True the scan stops once SCAN_STALL_PAGES pages in a row add no attendee
+        to any of the sessions, so counts may come out low. first_page is an optional
+        prefetch of the scan's page 0.
+        """
+        if self._session_filter_supported is not False:
+            # Every session's first page is requested at once; the rare extra pages fan out in _iter_pages
+            endpoint = f'events/{event_id}/checkin'
+            session_first_pages = [
+                self._submit_page(endpoint, {**SESSION_CHECKIN_SCAN_PARAMS, 'entity_id': sid})
+                for sid in session_ids
+            ]
+            try:
+                checkin_counts = {
+                    sid: self._count_session_checkins(event_id, sid, session_first_page)
+                    for sid, session_first_page in zip(session_ids, session_first_pages)
+                }
+                self._session_filter_supported = True
+                return checkin_counts
+            except (EventMobiRequestError, _SessionFilterIgnored) as filter_err:
+                if isinstance(filter_err, EventMobiRequestError) and filter_err.status_code != 400:
+                    raise
+                logger.warning("Session check-in filter not supported, scanning all check-ins: %s", filter_err)
+                self._session_filter_supported = False
+            finally:
+                # Drop first pages still queued if a session failed
+                for session_first_page in session_first_pages:
+                    session_first_page.cancel()
         
+        attendees_by_session = {}  # Will store sets of unique person IDs per session
+        session_id_set = set(session_ids)  # O(1) membership in the per-check-in loop
+        seen = stalled_pages = 0
+        for page_checkins in self._iter_pages(f'events/{event_id}/checkin', SESSION_CHECKIN_SCAN_PARAMS,
+                                              ('checkins',), first_page=first_page):
+            # Count unique attendees (people) per session
+            # For session pills, we show count of unique attendees who checked in
+            for checkin in page_checkins:
+                if isinstance(checkin, dict):
+                    entity_id = checkin.get('entity_id')
+                    if entity_id in session_id_set:
+                        # Initialize set for this session if needed
+                        if entity_id not in attendees_by_session:
+                            attendees_by_session[entity_id] = set()
+                        
+                        person_id = _checkin_person_id(checkin)
+                        if person_id:
+                            # Add person ID to set (automatically handles uniqueness)
+                            attendees_by_session[entity_id].add(_person_key(person_id))
+            
+            if fast:
+                page_seen = sum(len(people) for people in attendees_by_session.values())
+                stalled_pages = stalled_pages + 1 if page_seen == seen else 0
+                seen = page_seen
+                if stalled_pages >= SCAN_STALL_PAGES:
+                    break
+        return {sid: len(people) for sid, people in attendees_by_session.items()}
+    
+    def _parse_iso(self, value: str) -> datetime:
+        """Parse an ISO 8601 timestamp as an aware datetime (naive values are UTC), memoized"""
+        dt = self._dt_cache.get(value)
+        if dt is None:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            self._dt_cache[value] = dt
+        return dt
+    
+    def get_active_sessions(self, event_id: str, fast: bool = False) -> List[Dict]:
+        """Get sessions that are still on, starting within 30 minutes, or ended in the last 30 minutes (always up to 15 total, filled with last ended sessions if needed), with check-in counts"""
+        first_scan_page = None
         try:
+            # When the entity_id filter is known not to work, the counts need a full check-in
+            # scan; start its first page now so it overlaps with loading the sessions. Skipped
+            # while counts for the event are cached, since the scan then likely won't run
+            if (self._session_filter_supported is False
+                    and not self._has_cached('session_checkins', str(event_id), CHECKIN_COUNTS_CACHE_TTL)):
+                first_scan_page = self._submit_page(f'events/{event_id}/checkin', SESSION_CHECKIN_SCAN_PARAMS)
+            
             # Get all sessions
             all_sessions = self.get_sessions(event_id)
             
@@ -214,15 +615,8 @@ class EventMobiClient:
                 
                 try:
                     # Parse ISO datetime
-                    start_dt = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-                    if start_dt.tzinfo is None:
-                        start_dt = start_dt.replace(tzinfo=timezone.utc)
-                    
-                    end_dt = None
-                    if end_str:
-                        end_dt = datetime.fromisoformat(end_str.replace('Z', '+00:00'))
-                        if end_dt.tzinfo is None:
-                            end_dt = end_dt.replace(tzinfo=timezone.utc)
+                    start_dt = self._parse_iso(start_str)
+                    end_dt = self._parse_iso(end_str) if end_str else None
                     
                     session_id = session.get('id') or session.get('session_id')
                     if not session_id:
@@ -259,7 +653,7 @@ class EventMobiClient:
                         # Track all ended sessions with their end time for fallback
                         all_ended_session_ids.append((session_id, end_dt))
                 except Exception as parse_err:
-                    print(f"Error parsing session datetime: {parse_err}")
+                    logger.warning("Error parsing session datetime: %s", parse_err)
                     continue
             
             # Combine active and recently ended sessions, prioritizing active ones
@@ -271,87 +665,31 @@ class EventMobiClient:
             
             # If still not enough sessions, fill with last ended sessions (regardless of when they ended)
             remaining_slots = 15 - len(all_session_ids)
-            if remaining_slots > 0 and len(all_ended_session_ids) > 0:
-                # Sort all ended sessions by end time (most recent first)
-                all_ended_session_ids.sort(key=lambda x: x[1], reverse=True)
-                # Get session IDs that aren't already in our list
-                available_ended_ids = [
-                    sid for sid, _ in all_ended_session_ids 
-                    if sid not in all_session_ids
-                ]
-                all_session_ids.extend(available_ended_ids[:remaining_slots])
+            if remaining_slots > 0 and all_ended_session_ids:
+                # Most recently ended first, skipping IDs already in our list. Only the top
+                # remaining_slots are needed, so select them instead of sorting every ended session.
+                already = set(all_session_ids)
+                available_ended = (
+                    (sid, end_dt) for sid, end_dt in all_ended_session_ids
+                    if sid not in already
+                )
+                latest_ended = heapq.nlargest(remaining_slots, available_ended, key=lambda x: x[1])
+                all_session_ids.extend(sid for sid, _ in latest_ended)
             
             # Update to use all_session_ids instead of active_session_ids
             active_session_ids = all_session_ids
             
-            # Batch fetch check-in counts for active sessions only
-            # Count unique attendees (people) who checked in, not check-in records
-            # Note: The API doesn't support filtering by session_id, so we still need to fetch all
-            # but we can optimize by stopping early if we've counted all active sessions
-            checkin_counts_by_session = {}  # Will store sets of unique person IDs per session
-            try:
-                checkin_page = 0
-                checkin_limit = 1000
-                
-                # Track if we've found counts for all active sessions to potentially stop early
-                # (Though API doesn't guarantee order, so we still need all pages)
-                
-                while True:
-                    # Query session check-ins with person data to count unique attendees
-                    checkin_params = {
-                        'entity_type': 'sessions',
-                        'page': checkin_page,
-                        'limit': checkin_limit,
-                        'include': 'person'  # Include person data to get person_id
-                    }
-                    checkins_data = self._make_request('GET', f'events/{event_id}/checkin', params=checkin_params)
-                    
-                    # Parse response
-                    page_checkins = []
-                    if isinstance(checkins_data, list):
-                        page_checkins = checkins_data
-                    elif isinstance(checkins_data, dict):
-                        if 'data' in checkins_data:
-                            page_checkins = checkins_data['data']
-                        elif 'checkins' in checkins_data:
-                            page_checkins = checkins_data['checkins']
-                    
-                    if not page_checkins:
-                        break
-                    
-                    # Count unique attendees (people) per session
-                    # For session pills, we show count of unique attendees who checked in
-                    for checkin in page_checkins:
-                        if isinstance(checkin, dict):
-                            entity_id = checkin.get('entity_id')
-                            if entity_id and entity_id in active_session_ids:
-                                # Initialize set for this session if needed
-                                if entity_id not in checkin_counts_by_session:
-                                    checkin_counts_by_session[entity_id] = set()
-                                
-                                # Get person ID from checkin
-                                person = checkin.get('person') or {}
-                                person_id = person.get('id') or person.get('people_id') or checkin.get('person_id') or checkin.get('people_id')
-                                
-                                if person_id:
-                                    # Add person ID to set (automatically handles uniqueness)
-                                    checkin_counts_by_session[entity_id].add(str(person_id))
-                    
-                    # Check if we've fetched all items
-                    if isinstance(checkins_data, dict):
-                        meta = checkins_data.get('meta', {})
-                        total_items = meta.get('pagination', {}).get('total_items_count', 0)
-                        if len(page_checkins) < checkin_limit:
-                            break
-                        # If we know total and have processed all, break
-                        if total_items and (checkin_page + 1) * checkin_limit >= total_items:
-                            break
-                    elif len(page_checkins) < checkin_limit:
-                        break
-                    
-                    checkin_page += 1
-            except Exception as checkin_err:
-                print(f"Error fetching session check-in counts: {checkin_err}")
+            # Count unique attendees (people) who checked in per displayed session
+            checkin_counts_by_session = {}  # session_id -> unique attendee count
+            if active_session_ids:
+                try:
+                    checkin_counts_by_session = self._cached(
+                        ('session_checkins', str(event_id), tuple(active_session_ids), fast),
+                        CHECKIN_COUNTS_CACHE_TTL,
+                        lambda: self._session_checkin_counts(event_id, active_session_ids, fast, first_scan_page)
+                    )
+                except Exception as checkin_err:
+                    logger.warning("Error fetching session check-in counts: %s", checkin_err)
             
             # Build active sessions list with check-in counts
             active_sessions = []
@@ -360,13 +698,8 @@ class EventMobiClient:
                 start_str = session.get('start_datetime') or session.get('start_date_time')
                 end_str = session.get('end_datetime') or session.get('end_date_time')
                 
-                # Get unique attendee count from batch fetch (convert set to count)
-                attendee_set = checkin_counts_by_session.get(session_id, set())
-                if isinstance(attendee_set, set):
-                    checkin_count = len(attendee_set)
-                else:
-                    # Fallback: if it's not a set (shouldn't happen), default to 0
-                    checkin_count = 0
+                # Unique attendee count from the batch fetch
+                checkin_count = checkin_counts_by_session.get(session_id, 0)
                 
                 # Get capacity and registered counts
                 capacity = None
@@ -417,11 +750,34 @@ class EventMobiClient:
             return active_sessions
             
         except Exception as e:
-            print(f"Error fetching active sessions: {e}")
+            logger.warning("Error fetching active sessions: %s", e)
             return []
+        finally:
+            # Not consumed (cache hit, no sessions, error): don't let a queued prefetch run
+            if first_scan_page is not None:
+                first_scan_page.cancel()
+    
+    def _delete_webhooks(self, event_id: str, webhook_ids: List) -> None:
+        """Delete webhooks in parallel without waiting for them; failures are only reported"""
+        if not webhook_ids:
+            return
+        
+        def delete(webhook_id) -> None:
+            try:
+                self._make_request('DELETE', f'events/{event_id}/webhooks/{webhook_id}')
+                logger.info("Deleted old webhook %s", webhook_id)
+            except Exception as del_err:
+                logger.warning("Failed to delete webhook %s: %s", webhook_id, del_err)
+        
+        # Cleanup runs in the background so it doesn't delay the registration response
+        for webhook_id in webhook_ids:
+            _request_executor.submit(delete, webhook_id)
     
     def register_webhook(self, event_id: str, webhook_url: str, webhook_type: str = 'checkins') -> Dict:
-        """Register a webhook with EventMobi for an event"""
+        """Register a webhook with EventMobi for an event.
+        Reuses (and enables) an existing webhook with the same URL, otherwise creates a new one;
+        other webhooks of the same type are deleted so each check-in is delivered once.
+        """
         # According to Swagger: WebhookPost only requires callback_url and type
         payload = {
             'callback_url': webhook_url,
@@ -429,131 +785,49 @@ class EventMobiClient:
         }
         
         try:
-            # First, check if webhook already exists
+            # Single pass over existing webhooks of this type: exact URL matches vs stale URLs
+            matching_ids = []
+            stale_ids = []
             try:
                 webhooks = self._make_request('GET', f'events/{event_id}/webhooks', params={'type': webhook_type})
-                webhook_list = []
-                if isinstance(webhooks, list):
-                    webhook_list = webhooks
-                elif isinstance(webhooks, dict):
-                    webhook_list = webhooks.get('data', []) or webhooks.get('webhooks', [])
+                webhook_list = self._unwrap(webhooks, 'webhooks')
                 
-                print(f"Found {len(webhook_list)} existing webhook(s) of type '{webhook_type}'")
+                logger.info("Found %d existing webhook(s) of type '%s'", len(webhook_list), webhook_type)
                 
-                # Priority 1: Find webhook with exact same URL (enable it if disabled)
-                matching_webhook_id = None
                 for webhook in webhook_list:
-                    if webhook.get('type') == webhook_type:
-                        existing_url = webhook.get('callback_url')
-                        if existing_url == webhook_url:
-                            webhook_id = webhook.get('id') or webhook.get('webhook_id')
-                            if webhook_id:
-                                matching_webhook_id = webhook_id
-                                print(f"Found webhook {webhook_id} with matching URL. Enabling and updating...")
-                                # Update existing webhook using PATCH - ensure enabled and URL matches
-                                update_payload = {**payload, 'enabled': True}
-                                try:
-                                    result = self._make_request('PATCH', f'events/{event_id}/webhooks/{webhook_id}', json=update_payload)
-                                    print(f"Webhook updated successfully: {result}")
-                                    # Verify the webhook is enabled
-                                    if isinstance(result, dict):
-                                        webhook_data = result.get('data', result)
-                                        if isinstance(webhook_data, dict):
-                                            enabled = webhook_data.get('enabled', True)
-                                            callback_url = webhook_data.get('callback_url')
-                                            print(f"Webhook enabled status: {enabled}, URL: {callback_url}")
-                                    return result
-                                except Exception as patch_err:
-                                    print(f"PATCH failed, trying PUT: {patch_err}")
-                                    try:
-                                        update_payload_put = {**payload, 'enabled': True}
-                                        result = self._make_request('PUT', f'events/{event_id}/webhooks/{webhook_id}', json=update_payload_put)
-                                        print(f"Webhook updated successfully via PUT")
-                                        return result
-                                    except:
-                                        raise patch_err
-                
-                # Priority 2: If no exact match, disable old webhooks and update/create with new URL
-                # First, disable all other webhooks of this type (to avoid conflicts)
-                for webhook in webhook_list:
-                    if webhook.get('type') == webhook_type:
-                        webhook_id = webhook.get('id') or webhook.get('webhook_id')
-                        if webhook_id and webhook_id != matching_webhook_id:
-                            existing_url = webhook.get('callback_url')
-                            if existing_url != webhook_url:
-                                print(f"Disabling old webhook {webhook_id} with URL {existing_url}")
-                                try:
-                                    disable_payload = {'enabled': False}
-                                    self._make_request('PATCH', f'events/{event_id}/webhooks/{webhook_id}', json=disable_payload)
-                                except:
-                                    pass  # Ignore errors when disabling old webhooks
-                
-                # Priority 3: If we found a matching webhook but couldn't update it, or if no match exists,
-                # try updating the first webhook. If provider refuses to update URL, delete and recreate.
-                if not matching_webhook_id:
-                    for webhook in webhook_list:
-                        if webhook.get('type') == webhook_type:
-                            webhook_id = webhook.get('id') or webhook.get('webhook_id')
-                            if webhook_id:
-                                print(f"Updating existing webhook {webhook_id} with URL {webhook_url}")
-                                # Update existing webhook using PATCH - also update enabled status and URL
-                                update_payload = {**payload, 'enabled': True}
-                                try:
-                                    result = self._make_request('PATCH', f'events/{event_id}/webhooks/{webhook_id}', json=update_payload)
-                                    print(f"Webhook updated successfully: {result}")
-                                    # Verify the webhook is enabled
-                                    if isinstance(result, dict):
-                                        webhook_data = result.get('data', result)
-                                        if isinstance(webhook_data, dict):
-                                            enabled = webhook_data.get('enabled', True)
-                                            callback_url = webhook_data.get('callback_url')
-                                            print(f"Webhook enabled status: {enabled}, URL: {callback_url}")
-                                            # If URL didn't update, delete and recreate
-                                            if callback_url != webhook_url:
-                                                print(f"WARNING: Webhook URL didn't update (got {callback_url}, expected {webhook_url}). Deleting and recreating...")
-                                                try:
-                                                    self._make_request('DELETE', f'events/{event_id}/webhooks/{webhook_id}')
-                                                except Exception as del_err:
-                                                    print(f"Failed to delete webhook {webhook_id}: {del_err}")
-                                                # Create new
-                                                created = self._make_request('POST', f'events/{event_id}/webhooks', json=payload)
-                                                print(f"Webhook re-created: {created}")
-                                                return created
-                                    return result
-                                except Exception as patch_err:
-                                    # If PATCH fails, try PUT
-                                    print(f"PATCH failed, trying PUT: {patch_err}")
-                                    try:
-                                        update_payload_put = {**payload, 'enabled': True}
-                                        result = self._make_request('PUT', f'events/{event_id}/webhooks/{webhook_id}', json=update_payload_put)
-                                        print(f"Webhook updated successfully via PUT")
-                                        # Verify URL and fallback to delete+create if mismatch
-                                        if isinstance(result, dict):
-                                            webhook_data = result.get('data', result)
-                                            if isinstance(webhook_data, dict):
-                                                callback_url = webhook_data.get('callback_url')
-                                                if callback_url != webhook_url:
-                                                    print(f"PUT updated webhook but URL still mismatched (got {callback_url}). Deleting and recreating...")
-                                                    try:
-                                                        self._make_request('DELETE', f'events/{event_id}/webhooks/{webhook_id}')
-                                                    except Exception as del_err:
-                                                        print(f"Failed to delete webhook {webhook_id}: {del_err}")
-                                                    created = self._make_request('POST', f'events/{event_id}/webhooks', json=payload)
-                                                    print(f"Webhook re-created: {created}")
-                                                    return created
-                                        return result
-                                    except:
-                                        raise patch_err
-                                break  # Only update the first one
+                    webhook_id = webhook.get('id') or webhook.get('webhook_id')
+                    if webhook.get('type') != webhook_type or not webhook_id:
+                        continue
+                    if webhook.get('callback_url') == webhook_url:
+                        matching_ids.append(webhook_id)
+                    else:
+                        stale_ids.append(webhook_id)
             except Exception as list_err:
                 # If we can't list webhooks, try to create anyway
-                print(f"Could not list existing webhooks: {list_err}")
-                pass
+                logger.warning("Could not list existing webhooks: %s", list_err)
             
-            # Try to create new webhook
-            print(f"Creating new webhook with URL {webhook_url}")
+            if matching_ids:
+                # Enable the webhook that already has our URL; extra copies would duplicate deliveries
+                webhook_id = matching_ids[0]
+                logger.info("Found webhook %s with matching URL. Enabling...", webhook_id)
+                update_payload = {**payload, 'enabled': True}
+                try:
+                    result = self._make_request('PATCH', f'events/{event_id}/webhooks/{webhook_id}', json=update_payload)
+                except Exception as patch_err:
+                    logger.warning("PATCH failed, trying PUT: %s", patch_err)
+                    try:
+                        result = self._make_request('PUT', f'events/{event_id}/webhooks/{webhook_id}', json=update_payload)
+                    except Exception:
+                        raise patch_err
+                logger.info("Webhook updated successfully: %s", result)
+                self._delete_webhooks(event_id, matching_ids[1:] + stale_ids)
+                return result
+            
+            # Create the new webhook first, then remove the stale ones it replaces
+            logger.info("Creating new webhook with URL %s", webhook_url)
             result = self._make_request('POST', f'events/{event_id}/webhooks', json=payload)
-            print(f"Webhook created successfully: {result}")
+            logger.info("Webhook created successfully: %s", result)
+            self._delete_webhooks(event_id, stale_ids)
             
             # Verify the webhook was created and enabled
             if isinstance(result, dict):
@@ -561,7 +835,7 @@ class EventMobiClient:
                 if isinstance(webhook_data, dict):
                     webhook_id = webhook_data.get('id')
                     enabled = webhook_data.get('enabled', True)
-                    print(f"Webhook ID: {webhook_id}, Enabled: {enabled}, URL: {webhook_data.get('callback_url')}")
+                    logger.info("Webhook ID: %s, Enabled: %s, URL: %s", webhook_id, enabled, webhook_data.get('callback_url'))
                     
             return result
         except Exception as e:
@@ -571,11 +845,7 @@ class EventMobiClient:
                 # Webhook might already exist, try to update it anyway
                 try:
                     webhooks = self._make_request('GET', f'events/{event_id}/webhooks')
-                    webhook_list = []
-                    if isinstance(webhooks, list):
-                        webhook_list = webhooks
-                    elif isinstance(webhooks, dict):
-                        webhook_list = webhooks.get('data', []) or webhooks.get('webhooks', [])
+                    webhook_list = self._unwrap(webhooks, 'webhooks')
                     
                     for webhook in webhook_list:
                         if webhook.get('type') == webhook_type:
@@ -588,148 +858,40 @@ class EventMobiClient:
             raise Exception(f"Failed to register webhook: {error_msg}")
     
     def get_event_stats(self, event_id: str) -> Dict:
-        """Get statistics for an event (attendees, check-ins)
+        """Get statistics for an event (attendees, check-ins), cached for STATS_CACHE_TTL
+        seconds or until invalidate(event_id)
+        """
+        return self._cached(('event_stats', str(event_id)), STATS_CACHE_TTL,
+                            lambda: self._fetch_event_stats(event_id))
+    
+    def _fetch_event_stats(self, event_id: str) -> Dict:
+        """Fetch statistics for an event (attendees, check-ins)
         Efficiently gets totals with pagination support.
         Optimized to avoid duplicate full fetches when get_active_sessions is also called.
         """
         try:
-            # Get total attendees count from metadata instead of paginating through all attendees
-            # The people endpoint provides the total count in meta.pagination.total_items_count
-            # This is much faster - we only need 1 API call with limit=1 instead of 3+ pages
+            # All three totals come from meta.pagination.total_items_count of a limit=1 page
+            # (one tiny request each instead of paginating); the requests are independent,
+            # so issue them together and wait for the slowest rather than their sum
+            attendees_count = _request_executor.submit(self._fetch_count, f'events/{event_id}/people', {})
+            session_checkins_count = _request_executor.submit(self._fetch_count, f'events/{event_id}/checkin', {'entity_type': 'sessions'})
+            event_checkins_count = _request_executor.submit(self._fetch_count, f'events/{event_id}/checkin', {'entity_type': 'events'})
+            
             total_attendees = 0
             try:
-                attendees_params = {'page': 0, 'limit': 1}
-                attendees_data = self._make_request('GET', f'events/{event_id}/people', params=attendees_params)
-                
-                # Extract total count from metadata
-                if isinstance(attendees_data, dict):
-                    meta = attendees_data.get('meta', {})
-                    pagination = meta.get('pagination', {})
-                    total_attendees = pagination.get('total_items_count', 0)
+                total_attendees = attendees_count.result()
             except Exception as attendees_err:
-                print(f"Could not get total attendees from metadata: {attendees_err}")
-                # Fallback: fetch all attendees if metadata not available
-                all_attendees = self.get_attendees(event_id)
-                total_attendees = len(all_attendees)
-            
-            # Count check-ins directly from the checkin endpoint (more efficient than people endpoint)
-            # This avoids the need to fetch all checked-in people separately
-            session_checkins_count = 0
-            event_checkins_count = 0
-            
-            try:
-                # Use metadata total_items_count instead of paginating through all records
-                # The checkin endpoint provides the total count in meta.pagination.total_items_count
-                # This is much faster - we only need to make 2 API calls instead of potentially dozens
-                
-                # Get session check-ins total count from metadata (limit=1 to minimize data transfer)
-                session_checkin_params = {
-                    'entity_type': 'sessions',
-                    'page': 0,
-                    'limit': 1  # We only need the metadata, not the actual data
-                }
-                session_checkins_data = self._make_request('GET', f'events/{event_id}/checkin', params=session_checkin_params)
-                
-                # Extract total count from metadata
-                if isinstance(session_checkins_data, dict):
-                    meta = session_checkins_data.get('meta', {})
-                    pagination = meta.get('pagination', {})
-                    session_checkins_count = pagination.get('total_items_count', 0)
-                else:
-                    # Fallback: if metadata not available, count manually (shouldn't happen)
-                    session_checkins_count = 0
-                
-                # Get event check-ins total count from metadata (limit=1 to minimize data transfer)
-                event_checkin_params = {
-                    'entity_type': 'events',
-                    'page': 0,
-                    'limit': 1  # We only need the metadata, not the actual data
-                }
-                event_checkins_data = self._make_request('GET', f'events/{event_id}/checkin', params=event_checkin_params)
-                
-                # Extract total count from metadata
-                if isinstance(event_checkins_data, dict):
-                    meta = event_checkins_data.get('meta', {})
-                    pagination = meta.get('pagination', {})
-                    event_checkins_count = pagination.get('total_items_count', 0)
-                else:
-                    # Fallback: if metadata not available, count manually (shouldn't happen)
-                    event_checkins_count = 0
-                
-            except Exception as checkin_err:
-                print(f"Could not count check-ins via checkin endpoint: {checkin_err}")
-                # Fallback: count from people objects (less efficient but works)
-                all_checkins = []
-                page = 0
-                limit = 1000
-                
-                while True:
-                    params = {'checkin_status': 'checked_in', 'page': page, 'limit': limit, 'include': 'checkins'}
-                    checkins_data = self._make_request('GET', f'events/{event_id}/people', params=params)
-                    
-                    page_checkins = []
-                    meta = {}
-                    
-                    if isinstance(checkins_data, list):
-                        page_checkins = checkins_data
-                        if len(page_checkins) < limit:
-                            all_checkins.extend(page_checkins)
-                            break
-                    elif isinstance(checkins_data, dict):
-                        if 'data' in checkins_data:
-                            page_checkins = checkins_data['data']
-                            meta = checkins_data.get('meta', {})
-                        elif 'people' in checkins_data:
-                            page_checkins = checkins_data['people']
-                    
-                    if not page_checkins:
-                        break
-                        
-                    all_checkins.extend(page_checkins)
-                    
-                    total_items = meta.get('pagination', {}).get('total_items_count', len(page_checkins))
-                    if len(all_checkins) >= total_items or len(page_checkins) < limit:
-                        break
-                        
-                    page += 1
-                
-                # Count from people objects
-                event_checkins_list = []
-                session_checkins_set = set()
-                
-                for person in all_checkins:
-                    person_id = person.get('id') or person.get('people_id')
-                    person_checkins = person.get('checkins', [])
-                    
-                    has_session_checkin = False
-                    if person_checkins:
-                        for checkin in person_checkins:
-                            if isinstance(checkin, dict):
-                                entity_type = checkin.get('entity_type')
-                                if entity_type == 'sessions':
-                                    has_session_checkin = True
-                                    break
-                    
-                    if not has_session_checkin and not person_checkins:
-                        has_session_checkin = (
-                            person.get('checkin_session_id') or 
-                            person.get('session_checkin_id') or
-                            person.get('session_checkin_ids')
-                        )
-                    
-                    if has_session_checkin:
-                        if person_id:
-                            session_checkins_set.add(person_id)
-                    else:
-                        event_checkins_list.append(person)
-                
-                session_checkins_count = len(session_checkins_set)
-                event_checkins_count = len(event_checkins_list)
+                logger.warning("Could not get total attendees from metadata: %s", attendees_err)
+                # Fallback: count all attendees if metadata not available
+                total_attendees = sum(1 for _ in self.iter_attendees(event_id))
             
+            # Count check-ins directly from the checkin endpoint (more efficient than people endpoint).
+            # There is no slow fallback: re-deriving these two numbers means paginating every
+            # checked-in person, so a failure here fails the stats call instead
             return {
                 'total_attendees': total_attendees,
-                'event_checkins': event_checkins_count,
-                'session_checkins': session_checkins_count
+                'event_checkins': event_checkins_count.result(),
+                'session_checkins': session_checkins_count.result()
             }
         except Exception as e:
             raise Exception(f"Failed to fetch event stats: {e}")
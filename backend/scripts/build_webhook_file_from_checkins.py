@@ -1,13 +1,30 @@
 #!/usr/bin/env python3
 import argparse
-import json
+import heapq
+import math
+import os
 import sys
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import Dict, Any, Iterable, List
-from urllib import request, parse, error
+from itertools import islice
+from typing import Callable, Dict, Any, Iterable, List, Optional
 
+import requests
+
+from http_common import json_bytes, json_line, json_loads, size_pool
 
 API_BASE = "https://uapi.eventmobi.com"
+# Payloads sorted in memory at once; larger outputs are merged from sorted temp files
+SORT_RUN_SIZE = 10000
+# Check-in fields tried in order for a payload's change_datetime
+CHANGE_DATETIME_FIELDS = ("change_datetime", "created_at", "created_datetime", "checkin_datetime", "updated_at", "timestamp")
+# Write buffer for the output and run files, so payloads reach the OS in large chunks
+WRITE_BUFFER_SIZE = 1 << 20
+
+# One keep-alive session for all requests, so each page costs a round trip, not a new TLS handshake;
+# iter_all_checkins() resizes its pool to the number of page workers
+SESSION = size_pool(requests.Session(), 8)
 
 
 def iso_now() -> str:
@@ -15,81 +32,120 @@ def iso_now() -> str:
 
 
 def http_get_json(path: str, params: Dict[str, Any], api_key: str, timeout: float = 20.0) -> Any:
-    qs = parse.urlencode(params, doseq=True)
     url = f"{API_BASE.rstrip('/')}/{path.lstrip('/')}"
-    if qs:
-        url = f"{url}?{qs}"
-    req = request.Request(url, method="GET")
-    req.add_header("Authorization", f"Bearer {api_key}")
-    # EventMobi requires a versioned Accept header
-    req.add_header("Accept", "application/vnd.eventmobi+json; version=4")
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        # EventMobi requires a versioned Accept header
+        "Accept": "application/vnd.eventmobi+json; version=4",
+    }
+    resp = SESSION.get(url, params=params, headers=headers, timeout=timeout)
+    if resp.status_code >= 400:
+        sys.stderr.write(f"HTTP {resp.status_code} for {resp.url}\n")
+        if resp.content:
+            sys.stderr.write(resp.content.decode("utf-8", errors="ignore") + "\n")
+        resp.raise_for_status()
+    if not resp.content:
+        return None
+    return json_loads(resp.content)
+
+
+def page_items(data: Any) -> List[Dict[str, Any]]:
+    """Check-ins of one page: the response may be a list or an envelope { data: [...] } or { checkins: [...] }."""
+    items: List[Dict[str, Any]] = []
+    if isinstance(data, list):
+        items = [x for x in data if isinstance(x, dict)]
+    elif isinstance(data, dict):
+        items = data.get("data") or data.get("checkins") or []
+        if isinstance(items, dict):
+            items = [items]
+        items = [x for x in items if isinstance(x, dict)]
+    return items
+
+
+def page_extractor(first: Any) -> Callable[[Any], List[Dict[str, Any]]]:
+    """Item extractor for the pages of one listing, specialized on the shape of its first page
+    (every page of a listing has the same shape); unusual shapes go through page_items."""
+    if isinstance(first, list):
+        return lambda data: [x for x in data if isinstance(x, dict)]
+    if isinstance(first, dict):
+        for key in ("data", "checkins"):
+            if isinstance(first.get(key), list):
+                return lambda data: [x for x in data.get(key) or () if isinstance(x, dict)]
+    return page_items
+
+
+def total_items_count(data: Any) -> int:
+    """meta.pagination.total_items_count of a page, or 0 when the response has no pagination meta."""
+    if isinstance(data, dict):
+        return (data.get("meta") or {}).get("pagination", {}).get("total_items_count") or 0
+    return 0
+
+
+def iter_all_checkins(event_id: str, api_key: str, include_person: bool = False, page_size: int = 1000,
+                      workers: int = 8) -> Iterable[Dict[str, Any]]:
+    """Yield all check-ins for both sessions and events entity types.
+
+    Page 0 of each type reports the total, so the remaining pages are fetched concurrently, at
+    most `workers` at a time, and yielded as they complete (i.e. not in page order). Without
+    pagination meta, pages are walked one by one until a short page.
+    """
+    path = f"events/{event_id}/checkin"
+    base_params: Dict[str, Any] = {"limit": page_size}
+    if include_person:
+        base_params["include"] = "person"
+
+    def fetch(entity_type: str, page: int) -> Any:
+        return http_get_json(path, params={**base_params, "entity_type": entity_type, "page": page}, api_key=api_key)
+
+    workers = max(1, workers)
+    # One pooled connection per worker, so none is discarded as "pool is full"
+    size_pool(SESSION, workers)
+    executor = ThreadPoolExecutor(max_workers=workers)
     try:
-        with request.urlopen(req, timeout=timeout) as resp:
-            data = resp.read()
-            if not data:
-                return None
-            return json.loads(data.decode("utf-8"))
-    except error.HTTPError as e:
-        sys.stderr.write(f"HTTP {e.code} for {url}\n")
-        data = e.read()
-        if data:
-            sys.stderr.write(data.decode("utf-8", errors="ignore") + "\n")
-        raise
-
-
-def iter_all_checkins(event_id: str, api_key: str, include_person: bool = False, page_size: int = 1000) -> Iterable[Dict[str, Any]]:
-    """Yield all check-ins for both sessions and events entity types."""
-    for entity_type in ("sessions", "events"):
-        page = 0
-        while True:
-            params = {
-                "entity_type": entity_type,
-                "page": page,
-                "limit": page_size,
-            }
-            if include_person:
-                params["include"] = "person"
-            data = http_get_json(f"events/{event_id}/checkin", params=params, api_key=api_key)
-
-            # Response may be a list or an envelope { data: [...] } or { checkins: [...] }
-            items: List[Dict[str, Any]] = []
-            if isinstance(data, list):
-                items = [x for x in data if isinstance(x, dict)]
-            elif isinstance(data, dict):
-                items = data.get("data") or data.get("checkins") or []
-                if isinstance(items, dict):
-                    items = [items]
-                items = [x for x in items if isinstance(x, dict)]
-
-            if not items:
-                break
-
-            for item in items:
-                yield item
-
-            # Stop if fewer than page_size returned
-            if len(items) < page_size:
-                break
-            page += 1
-
-
-def extract_change_datetime(checkin: Dict[str, Any]) -> str:
-    # Try several plausible timestamp fields; fallback to now
-    for key in (
-        "change_datetime",
-        "created_at",
-        "created_datetime",
-        "checkin_datetime",
-        "updated_at",
-        "timestamp",
-    ):
-        value = checkin.get(key)
-        if isinstance(value, str) and value:
-            return value
-    return iso_now()
-
-
-def to_webhook_payload(checkin: Dict[str, Any], event_id: str) -> Dict[str, Any]:
+        first_pages = {et: executor.submit(fetch, et, 0) for et in ("sessions", "events")}
+        for entity_type, first_page in first_pages.items():
+            first = first_page.result()
+            extract = page_extractor(first)
+            items = extract(first)
+            yield from items
+
+            total = total_items_count(first)
+            if total:
+                pages = iter(range(1, math.ceil(total / page_size)))
+                # A bounded window of pages in flight; each is dropped once yielded, so memory
+                # holds a few pages rather than the whole listing
+                in_flight = {executor.submit(fetch, entity_type, page) for page in islice(pages, workers)}
+                while in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for page in islice(pages, len(done)):
+                        in_flight.add(executor.submit(fetch, entity_type, page))
+                    for future in done:
+                        yield from extract(future.result())
+                    del done
+                continue
+
+            # No total reported: stop at the first empty or short page
+            page = 1
+            while len(items) == page_size:
+                items = extract(fetch(entity_type, page))
+                yield from items
+                page += 1
+    finally:
+        # Also runs when the caller stops early: queued pages are dropped, not fetched
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def extract_change_datetime(checkin: Dict[str, Any], now: Optional[str] = None) -> str:
+    # Try several plausible timestamp fields, skipping non-string values (e.g. a numeric
+    # created_at); fallback to now (computed only when needed)
+    get = checkin.get
+    return next(
+        (value for key in CHANGE_DATETIME_FIELDS if isinstance(value := get(key), str) and value),
+        None,
+    ) or now or iso_now()
+
+
+def to_webhook_payload(checkin: Dict[str, Any], event_id: str, now: Optional[str] = None) -> Dict[str, Any]:
     chk_id = (
         checkin.get("id")
         or checkin.get("checkin_id")
@@ -101,11 +157,30 @@ def to_webhook_payload(checkin: Dict[str, Any], event_id: str) -> Dict[str, Any]
         "resource_ids": [chk_id] if chk_id else [],
         "event_id": event_id,
         "type": "checkins",
-        "change_datetime": extract_change_datetime(checkin),
+        "change_datetime": extract_change_datetime(checkin, now),
     }
     return payload
 
 
+def sort_key(ev: Dict[str, Any]) -> str:
+    return ev.get("change_datetime") or ""
+
+
+def write_sorted_run(events: List[Dict[str, Any]], tmp_dir: str) -> str:
+    """Sort a batch of payloads and spill it to a JSONL file in tmp_dir; returns its path."""
+    events.sort(key=sort_key)
+    fd, path = tempfile.mkstemp(suffix=".jsonl", dir=tmp_dir)
+    with os.fdopen(fd, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        f.writelines(map(json_line, events))
+    return path
+
+
+def read_run(path: str) -> Iterable[Dict[str, Any]]:
+    with open(path, "rb") as f:
+        for line in f:
+            yield json_loads(line)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Fetch all EventMobi check-ins and write webhook-style payloads to a file")
     parser.add_argument("--api-key", required=True, help="EventMobi API key")
@@ -113,30 +188,41 @@ def main() -> None:
     parser.add_argument("--output", required=True, help="Output file path (.jsonl or .json)")
     parser.add_argument("--include-person", action="store_true", help="Include person data in the checkin fetch (slower)")
     parser.add_argument("--json", dest="as_json", action="store_true", help="Write a JSON array instead of JSONL")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent page requests. Default: 8")
 
     args = parser.parse_args()
 
-    # Fetch
-    checkins = list(iter_all_checkins(args.event_id, args.api_key, include_person=args.include_person))
-
-    # Convert to webhook-style payloads
-    events = [to_webhook_payload(c, args.event_id) for c in checkins]
-
-    # Sort by change_datetime if present
-    def sort_key(ev: Dict[str, Any]):
-        return ev.get("change_datetime") or ""
-    events.sort(key=sort_key)
-
-    # Write
-    if args.as_json or args.output.lower().endswith(".json"):
-        with open(args.output, "w", encoding="utf-8") as f:
-            json.dump(events, f, ensure_ascii=False)
-    else:
-        with open(args.output, "w", encoding="utf-8") as f:
-            for ev in events:
-                f.write(json.dumps(ev, ensure_ascii=False) + "\n")
-
-    print(f"Wrote {len(events)} webhook event(s) to {args.output}")
+    # Fetch and convert to webhook-style payloads as pages arrive; sort by change_datetime
+    # in bounded memory (sorted runs spilled to temp files, then merged while writing)
+    count = 0
+    # One shared timestamp for check-ins without any timestamp field
+    now = iso_now()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        run_paths: List[str] = []
+        run: List[Dict[str, Any]] = []
+        for checkin in iter_all_checkins(args.event_id, args.api_key, include_person=args.include_person, workers=args.workers):
+            run.append(to_webhook_payload(checkin, args.event_id, now))
+            if len(run) >= SORT_RUN_SIZE:
+                run_paths.append(write_sorted_run(run, tmp_dir))
+                run = []
+        run.sort(key=sort_key)
+        events = heapq.merge(*(read_run(path) for path in run_paths), run, key=sort_key)
+
+        # Write; events is a lazy merge, so the array is streamed element by element too
+        with open(args.output, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            if args.as_json or args.output.lower().endswith(".json"):
+                f.write(b"[")
+                for ev in events:
+                    if count:
+                        f.write(b",")
+                    f.write(json_bytes(ev))
+                    count += 1
+                f.write(b"]")
+            else:
+                for count, line in enumerate(map(json_line, events), 1):
+                    f.write(line)
+
+    print(f"Wrote {count} webhook event(s) to {args.output}")
 
 
 if __name__ == "__main__":
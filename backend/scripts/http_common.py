@@ -0,0 +1,42 @@
+"""HTTP session and JSON helpers shared by the webhook scripts in this directory."""
+import json
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+
+    def json_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def json_line(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+    json_loads = orjson.loads
+except ImportError:  # stdlib fallback: same data, slower and with spaces after separators
+    def json_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def json_line(obj: Any) -> bytes:
+        return json_bytes(obj) + b"\n"
+
+    json_loads = json.loads
+
+
+def size_pool(session: requests.Session, pool_maxsize: int) -> requests.Session:
+    """Mount a keep-alive adapter holding up to pool_maxsize connections per host on session.
+
+    Transient statuses are retried for GETs only; POSTs are only retried on connection
+    errors (urllib3's default allowed_methods), so a webhook is never delivered twice.
+    """
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=max(1, pool_maxsize),
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -1,12 +1,41 @@
 #!/usr/bin/env python3
+# Run as a script, replay workers are gevent greenlets instead of OS threads when gevent is
+# installed (it is a backend dependency), so a high --concurrency costs a few KB per in-flight
+# request rather than a thread stack. Patching must happen before requests/ssl are imported.
+if __name__ == "__main__":
+    try:
+        from gevent import monkey
+
+        monkey.patch_all()
+    except ImportError:
+        pass
+
 import argparse
-import json
+import heapq
+import threading
 import time
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 import random
-from urllib import request, error
-from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from http_common import json_bytes, json_loads, size_pool
+
+
+EPOCH = datetime.fromtimestamp(0, tz=timezone.utc)
+
+# Keep-alive session shared by all replay threads; sized by configure_session()
+SESSION = requests.Session()
+
+
+def configure_session(concurrency: int) -> None:
+    """Size the connection pool for the given number of in-flight requests."""
+    size_pool(SESSION, max(1, concurrency) * 2)
+
+
+configure_session(1)
 
 
 def parse_iso(dt: str) -> datetime:
@@ -18,57 +47,140 @@ def parse_iso(dt: str) -> datetime:
 
 
 def post_json(url: str, payload: Dict[str, Any], timeout: float = 10.0) -> int:
-    data = json.dumps(payload).encode("utf-8")
-    req = request.Request(url, data=data, method="POST")
-    req.add_header("Content-Type", "application/json")
     try:
-        with request.urlopen(req, timeout=timeout) as resp:
-            _ = resp.read()
-            return getattr(resp, "status", 200)
-    except error.HTTPError as e:
-        return e.code
+        headers = {"Content-Type": "application/json"}
+        return SESSION.post(url, data=json_bytes(payload), headers=headers, timeout=timeout).status_code
     except Exception:
         return 0
 
 
-def load_events(path: str) -> List[Dict[str, Any]]:
-    """Load webhook payloads from a JSONL (one JSON object per line) or a JSON array file."""
-    with open(path, "r", encoding="utf-8") as f:
-        text = f.read().strip()
-        if not text:
-            return []
-        # Try JSON array first
-        if text[0] == "[":
-            arr = json.loads(text)
-            return [e for e in arr if isinstance(e, dict)]
+def load_events(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield webhook payloads from a JSONL (one JSON object per line) or a JSON array file.
+    JSONL is streamed line by line, so only the parsed payloads are ever held in memory."""
+    with open(path, "rb") as f:
+        # Peek at the first non-whitespace byte to tell a JSON array from JSONL
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if not first:
+            return
+        f.seek(0)
+        if first == b"[":
+            # No streaming array parser in the stdlib; an array has to be parsed whole
+            for e in json_loads(f.read()):
+                if isinstance(e, dict):
+                    yield e
+            return
         # Otherwise treat as JSONL
-        events = []
-        for line in text.splitlines():
+        for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                obj = json.loads(line)
-                if isinstance(obj, dict):
-                    events.append(obj)
+                obj = json_loads(line)
             except Exception:
                 continue
-        return events
+            if isinstance(obj, dict):
+                yield obj
+
+
+def event_datetime(e: Dict[str, Any]) -> Optional[datetime]:
+    """change_datetime of a payload as a datetime, or None if missing or unparseable."""
+    dt = e.get("change_datetime")
+    if not dt:
+        return None
+    try:
+        return parse_iso(dt)
+    except Exception:
+        return None
+
+
+def sort_by_change_datetime(events: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Optional[datetime]]]:
+    """Sort payloads by change_datetime (missing ones first); returns them with their parsed
+    datetimes as a parallel list, so each timestamp is parsed once and the payloads stay as sent."""
+    events = list(events)
+    dts = [event_datetime(e) for e in events]
+    # Sort indices on the parsed datetimes: comparing raw strings would misorder mixed offsets
+    # ("Z" vs "+02:00"), and a list lookup as key avoids a Python-level call per comparison key
+    keys = [dt or EPOCH for dt in dts]
+    order = sorted(range(len(events)), key=keys.__getitem__)
+    return [events[i] for i in order], [dts[i] for i in order]
+
+
+def build_schedule(
+    event_dts: List[Optional[datetime]],
+    speed: float,
+    min_gap: float,
+    max_gap: float,
+    first_gap_max: float = 5.0,
+    jitter: float = 0.3,
+    burst_prob: float = 0.2,
+    max_burst: int = 3,
+    burst_gap: float = 0.05,
+    concurrency: int = 1,
+    randomize_concurrency: bool = False,
+    rng: Optional[random.Random] = None,
+) -> List[Tuple[float, int, int]]:
+    """Plan the whole replay up front: (send offset in seconds, event index, in-flight limit) per event.
+    Pass a seeded rng for a reproducible schedule."""
+    # All random draws happen here, once, bound to locals for the per-event loop
+    rng = rng or random.Random()
+    uniform, coin, randint = rng.uniform, rng.random, rng.randint
+
+    def in_flight_limit() -> int:
+        if randomize_concurrency:
+            # Randomize the in-flight cap between 1 and the configured concurrency
+            return max(1, randint(1, max(1, concurrency)))
+        return max(1, concurrency)
+
+    schedule: List[Tuple[float, int, int]] = []
+    # Offsets come from original deltas of change_datetime; fall back to min_gap if missing
+    send_at = 0.0
+    last_dt = None
+    first_sleep_applied = False
+    i = 0
+    n = len(event_dts)
+    while i < n:
+        dt = event_dts[i]
 
+        # Gap according to original delta scaled by speed, with jitter and optional first cap
+        if last_dt and dt:
+            delta = (dt - last_dt).total_seconds()
+            gap = max(min_gap, min(max_gap, max(0.0, delta / max(speed, 1e-6))))
+            # Apply jitter +/- jitter%
+            if jitter > 0:
+                factor = uniform(max(0.0, 1 - jitter), 1 + jitter)
+                gap *= factor
+                gap = max(min_gap, min(max_gap, gap))
+            if not first_sleep_applied:
+                gap = min(gap, first_gap_max)
+                first_sleep_applied = True
+            send_at += gap
+        elif schedule:
+            send_at += min_gap
 
-def sort_by_change_datetime(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    def key(e: Dict[str, Any]):
-        dt = e.get("change_datetime")
-        try:
-            return parse_iso(dt) if dt else datetime.fromtimestamp(0, tz=timezone.utc)
-        except Exception:
-            return datetime.fromtimestamp(0, tz=timezone.utc)
-    return sorted(events, key=key)
+        schedule.append((send_at, i, in_flight_limit()))
+        last_dt = dt or last_dt
+        i += 1
+
+        # Occasionally send a burst of additional events close together
+        if i < n and burst_prob > 0 and coin() < burst_prob:
+            burst_count = randint(1, max(1, max_burst - 1))
+            for _k in range(burst_count):
+                if i >= n:
+                    break
+                send_at += burst_gap
+                schedule.append((send_at, i, in_flight_limit()))
+                # Update last_dt with the nominal timestamp to keep relative pacing reasonable
+                last_dt = event_dts[i] or last_dt
+                i += 1
+
+    return schedule
 
 
 def replay(
     url: str,
-    events: List[Dict[str, Any]],
+    events: Iterable[Dict[str, Any]],
     speed: float,
     min_gap: float,
     max_gap: float,
@@ -79,91 +191,57 @@ def replay(
     burst_gap: float = 0.05,
     concurrency: int = 1,
     randomize_concurrency: bool = False,
+    seed: Optional[int] = None,
 ) -> None:
+    # Sorting materializes the events exactly once, whether given a list or load_events()
+    events, event_dts = sort_by_change_datetime(events)
     if not events:
         print("No events to replay")
         return
 
-    events = sort_by_change_datetime(events)
+    configure_session(concurrency)
+    schedule = build_schedule(
+        event_dts, speed, min_gap, max_gap, first_gap_max, jitter,
+        burst_prob, max_burst, burst_gap, concurrency, randomize_concurrency,
+        rng=random.Random(seed),
+    )
+    heapq.heapify(schedule)
 
-    def submit_request(ev: Dict[str, Any], pending_futures: set, executor: ThreadPoolExecutor, max_in_flight: int) -> set:
-        fut = executor.submit(post_json, url, ev)
-        pending_futures.add(fut)
-        # Backpressure to keep in-flight requests under the concurrency limit
-        while len(pending_futures) >= max(1, max_in_flight):
-            done, not_done = wait(pending_futures, return_when=FIRST_COMPLETED)
-            pending_futures = not_done
-            break
-        return pending_futures
+    # Workers pop the next slot, sleep until its absolute send time and post it. Pacing is
+    # anchored to the start time, so it doesn't drift with request latency.
+    schedule_lock = threading.Lock()
+    slots = threading.Condition()
+    in_flight = 0
+    start = time.monotonic()
 
-    # Compute original gaps from change_datetime; fall back to min_gap if missing
-    last_dt = None
-    sent = 0
-    first_sleep_applied = False
-    i = 0
-    n = len(events)
-    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
-        pending = set()
-        while i < n:
-            ev = events[i]
-            dt_str = ev.get("change_datetime")
-            dt = None
+    def worker() -> int:
+        nonlocal in_flight
+        sent = 0
+        while True:
+            with schedule_lock:
+                if not schedule:
+                    return sent
+                send_at, index, limit = heapq.heappop(schedule)
+            delay = start + send_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            # Backpressure: wait until in-flight requests are under this slot's limit
+            with slots:
+                while in_flight >= limit:
+                    slots.wait()
+                in_flight += 1
             try:
-                dt = parse_iso(dt_str) if dt_str else None
-            except Exception:
-                dt = None
-
-            # Sleep according to original delta scaled by speed, with jitter and optional first cap
-            if last_dt and dt:
-                delta = (dt - last_dt).total_seconds()
-                sleep_for = max(min_gap, min(max_gap, max(0.0, delta / max(speed, 1e-6))))
-                # Apply jitter +/- jitter%
-                if jitter > 0:
-                    factor = random.uniform(max(0.0, 1 - jitter), 1 + jitter)
-                    sleep_for *= factor
-                    sleep_for = max(min_gap, min(max_gap, sleep_for))
-                if not first_sleep_applied:
-                    sleep_for = min(sleep_for, first_gap_max)
-                    first_sleep_applied = True
-                time.sleep(sleep_for)
-            elif sent > 0:
-                time.sleep(min_gap)
-
-            # Submit current event without blocking
-            effective_limit = concurrency
-            if randomize_concurrency:
-                # Randomize the in-flight cap between 1 and the configured concurrency
-                effective_limit = max(1, random.randint(1, max(1, concurrency)))
-            pending = submit_request(ev, pending, executor, effective_limit)
-            sent += 1
-            last_dt = dt or last_dt
-            i += 1
-
-            # Occasionally send a burst of additional events close together
-            if i < n and burst_prob > 0 and random.random() < burst_prob:
-                burst_count = random.randint(1, max(1, max_burst - 1))
-                for _k in range(burst_count):
-                    if i >= n:
-                        break
-                    time.sleep(burst_gap)
-                    ev_b = events[i]
-                    effective_limit_burst = concurrency
-                    if randomize_concurrency:
-                        effective_limit_burst = max(1, random.randint(1, max(1, concurrency)))
-                    pending = submit_request(ev_b, pending, executor, effective_limit_burst)
-                    sent += 1
-                    # Update last_dt with the nominal timestamp to keep relative pacing reasonable
-                    dtb_str = ev_b.get("change_datetime")
-                    try:
-                        dtb = parse_iso(dtb_str) if dtb_str else None
-                    except Exception:
-                        dtb = None
-                    last_dt = dtb or last_dt
-                    i += 1
-
-        # Drain any outstanding requests before exiting
-        if pending:
-            wait(pending)
+                post_json(url, events[index])
+                sent += 1
+            finally:
+                with slots:
+                    in_flight -= 1
+                    slots.notify_all()
+
+    workers = max(1, concurrency)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(worker) for _ in range(workers)]
+        sent = sum(f.result() for f in futures)
 
     print(f"Replayed {sent} event(s) to {url}")
 
@@ -182,13 +260,13 @@ def main() -> None:
     parser.add_argument("--burst-gap", type=float, default=0.05, help="Gap (seconds) between events inside a burst. Default: 0.05")
     parser.add_argument("--concurrency", type=int, default=1, help="Max in-flight HTTP requests. Default: 1")
     parser.add_argument("--randomize-concurrency", action="store_true", help="Randomize in-flight limit between 1 and --concurrency to avoid steady fixed parallelism")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for a reproducible schedule (jitter, bursts, concurrency)")
 
     args = parser.parse_args()
 
-    events = load_events(args.input)
     replay(
         args.url,
-        events,
+        load_events(args.input),
         speed=args.speed,
         min_gap=args.min_gap,
         max_gap=args.max_gap,
@@ -199,6 +277,7 @@ def main() -> None:
         burst_gap=args.burst_gap,
         concurrency=args.concurrency,
         randomize_concurrency=args.randomize_concurrency,
+        seed=args.seed,
     )
 
 
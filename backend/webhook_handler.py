@@ -1,97 +1,120 @@
-from typing import Dict, Optional
+import logging
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Webhook types and operations turned into check-in bubbles
+ACCEPTED_WEBHOOK_TYPES = frozenset({'checkins'})
+ACCEPTED_OPERATIONS = frozenset({'create'})
+# Bubble text per checkin_type as (attendee name, parsed data) -> message; unknown types read as 'event'.
+# Only templates that show a location look it up
+BUBBLE_TEMPLATES = {
+    'session': lambda name, data: f"{name} just checked into session \"{data.get('location_name', 'the event')}\"",
+    'event': lambda name, data: f"{name} just checked into your event",
+}
+# Most check-in IDs accepted in one webhook; larger batches are rejected as malformed
+MAX_RESOURCE_IDS = 1000
+
+
+class ParsedCheckin(NamedTuple):
+    """A check-in webhook accepted by WebhookHandler.parse_checkin_event"""
+    resource_ids: List[Any]
+    operation: str
+    event_id: Optional[Any]
+    change_datetime: Optional[str]
+    webhook_type: str
 
 
 class WebhookHandler:
     """Handles incoming webhook events from EventMobi"""
     
     @staticmethod
-    def parse_checkin_event(webhook_data: Dict) -> Optional[Dict]:
+    def parse_checkin_event(webhook_data: Dict) -> Optional[ParsedCheckin]:
         """
         Parse webhook data and extract relevant information for check-in events.
         EventMobi sends 'checkins' webhooks with resource_ids (checkin IDs).
-        Returns a dict with: resource_ids, operation, event_id, change_datetime
+        Returns a ParsedCheckin (resource_ids, operation, event_id, change_datetime, ...)
         """
-        try:
-            # EventMobi webhook structure for checkins:
-            # {
-            #   "operation": "create" (for check-in) or "delete" (for checkout),
-            #   "resource_ids": ["checkin_id1", "checkin_id2"],
-            #   "event_id": 123,
-            #   "type": "checkins",
-            #   "change_datetime": "..."
-            # }
-            
-            webhook_type = webhook_data.get('type') or webhook_data.get('event_type')
-            operation = webhook_data.get('operation') or webhook_data.get('action')
-            
-            # Only process 'checkins' type webhooks
-            if webhook_type != 'checkins':
-                return None
-            
-            # Extract resource IDs (checkin IDs)
-            resource_ids = webhook_data.get('resource_ids', [])
-            if not resource_ids:
-                return None
-            
-            # Only process 'create' operations (actual check-ins, not checkouts)
-            if operation != 'create':
-                return None
-            
-            return {
-                'resource_ids': resource_ids,
-                'operation': operation,
-                'event_id': webhook_data.get('event_id'),
-                'change_datetime': webhook_data.get('change_datetime'),
-                'webhook_type': webhook_type,
-                'raw_data': webhook_data
-            }
-            
-        except Exception as e:
-            print(f"Error parsing webhook data: {e}")
+        # Bodies that aren't a JSON object (null, arrays, strings) can't be webhooks
+        if not isinstance(webhook_data, dict):
+            return None
+        
+        # EventMobi webhook structure for checkins:
+        # {
+        #   "operation": "create" (for check-in) or "delete" (for checkout),
+        #   "resource_ids": ["checkin_id1", "checkin_id2"],
+        #   "event_id": 123,
+        #   "type": "checkins",
+        #   "change_datetime": "..."
+        # }
+        
+        # Each field is only read once the previous gate passed, so the common rejects
+        # (other types, checkouts) cost one or two lookups
+        get = webhook_data.get
+        webhook_type = get('type') or get('event_type')
+        
+        # Only process 'checkins' type webhooks (set lookups need a hashable, so check for str first)
+        if not isinstance(webhook_type, str) or webhook_type not in ACCEPTED_WEBHOOK_TYPES:
+            return None
+        
+        # Only process 'create' operations (actual check-ins, not checkouts)
+        operation = get('operation') or get('action')
+        if not isinstance(operation, str) or operation not in ACCEPTED_OPERATIONS:
+            return None
+        
+        # Extract resource IDs (checkin IDs): a non-empty, bounded list
+        resource_ids = get('resource_ids')
+        if not resource_ids or not isinstance(resource_ids, list) or len(resource_ids) > MAX_RESOURCE_IDS:
             return None
+        
+        return ParsedCheckin(
+            resource_ids,
+            operation,
+            get('event_id'),
+            get('change_datetime'),
+            webhook_type,
+        )
     
     @staticmethod
     def format_bubble_message(parsed_data: Dict) -> str:
         """Format parsed webhook data into a bubble message"""
         attendee_name = parsed_data.get('attendee_name', 'Someone')
         checkin_type = parsed_data.get('checkin_type', 'event')
-        location_name = parsed_data.get('location_name', 'the event')
         
-        if checkin_type == 'session':
-            return f"{attendee_name} just checked into session \"{location_name}\""
-        else:
-            return f"{attendee_name} just checked into your event"
+        # Non-string types (a JSON list or object isn't hashable) read as 'event' too
+        template = BUBBLE_TEMPLATES['event']
+        if isinstance(checkin_type, str):
+            template = BUBBLE_TEMPLATES.get(checkin_type, template)
+        return template(attendee_name, parsed_data)
     
     @staticmethod
-    def process_webhook(webhook_data: Dict) -> Optional[Dict]:
+    def process_webhook(webhook_data: Dict) -> Iterator[Dict]:
         """
-        Process incoming webhook and return formatted data for broadcasting.
-        For 'people' webhooks, we need to fetch person data to check if it's a check-in.
+        Process incoming webhook and yield formatted data for broadcasting, one item per
+        check-in (EventMobi batches several check-in IDs into one webhook).
+        Each item still needs its person data fetched to name the attendee.
         """
-        parsed = WebhookHandler.parse_checkin_event(webhook_data)
-        if not parsed:
-            return None
+        try:
+            parsed = WebhookHandler.parse_checkin_event(webhook_data)
+        except Exception:
+            logger.exception("Error parsing webhook data")
+            return
+        if parsed is None:
+            return
         
         # If we got basic webhook info, we need to fetch person data
-        # For now, we'll return a simplified message that indicates a person change
+        # For now, we'll yield a simplified message per check-in
         # In production, you'd fetch person data here via API to get check-in status
-        
-        # Extract what we can from the webhook
-        resource_ids = parsed.get('resource_ids', [])
-        operation = parsed.get('operation', 'update')
-        
-        # For now, treat people updates as potential check-ins
-        # We'd need the API client to fetch person details
-        # For now, return a generic message
-        attendee_name = f"Person {resource_ids[0][:8]}..." if resource_ids else "Someone"
-        
-        return {
-            'message': f"{attendee_name} just checked in",
-            'attendee_name': attendee_name,
-            'checkin_type': 'event',  # Default to event, could be session
-            'location_name': 'the event',
-            'timestamp': parsed.get('change_datetime'),
-            'resource_ids': resource_ids,
-            'needs_fetch': True  # Flag indicating we need to fetch person data
-        }
-
+        timestamp = parsed.change_datetime
+        for resource_id in parsed.resource_ids:
+            # We'd need the API client to fetch person details; for now, a generic name
+            attendee_name = f"Person {str(resource_id)[:8]}..."
+            yield {
+                'message': f"{attendee_name} just checked in",
+                'attendee_name': attendee_name,
+                'checkin_type': 'event',  # Default to event, could be session
+                'location_name': 'the event',
+                'timestamp': timestamp,
+                'resource_ids': [resource_id],
+                'needs_fetch': True  # Flag indicating we need to fetch person data
+            }
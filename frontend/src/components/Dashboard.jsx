@@ -9,6 +9,8 @@ import SymphonyPlayer from './SymphonyPlayer';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || window.location.origin;
 const IS_DEV = process.env.NODE_ENV !== 'production';
+// Check-in messages fetched per (debounced) poke; the stats refresh after the poke covers the rest
+const MAX_POKE_MESSAGES = 20;
 
 function Dashboard({ apiKey, eventId, eventName, webhookBaseUrl, webhookWarning, onReset }) {
   // Load from localStorage if props not provided or empty
@@ -374,9 +376,9 @@ function Dashboard({ apiKey, eventId, eventName, webhookBaseUrl, webhookWarning,
       if (!data || String(data.event_id) !== String(currentEventId)) {
         return;
       }
-      const resourceIds = Array.isArray(data.resource_ids) ? data.resource_ids : [];
-      if (resourceIds.length > 0) {
-        const id = resourceIds[0];
+      // A poke merges every check-in of its debounce window: one message per check-in
+      const resourceIds = Array.isArray(data.resource_ids) ? [...new Set(data.resource_ids)] : [];
+      resourceIds.slice(0, MAX_POKE_MESSAGES).forEach((id) => {
         fetch(`${API_BASE_URL}/api/event/${currentEventId}/checkin-message?id=${encodeURIComponent(id)}&api_key=${encodeURIComponent(currentApiKey)}`)
           .then(res => res.ok ? res.json() : res.json().then(j => Promise.reject(new Error(j.error || 'Failed to build message'))))
           .then(msg => {
@@ -404,7 +406,7 @@ function Dashboard({ apiKey, eventId, eventName, webhookBaseUrl, webhookWarning,
             }
           })
           .catch(() => {});
-      }
+      });
       if (pendingStatsRefreshRef.current) {
         clearTimeout(pendingStatsRefreshRef.current);
       }